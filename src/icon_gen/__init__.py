@@ -4,7 +4,20 @@ from importlib.metadata import version
 
 __version__ = version("icon-gen-ai")
 
+__all__ = [
+    "IconGenerator",
+    "IconAssistant",
+    "is_ai_available",
+    "get_available_providers",
+]
+
+_deps_checked = False
+
+
 def _check_deps():
+    global _deps_checked
+    if _deps_checked:
+        return
     try:
         import requests
         import urllib3
@@ -25,17 +38,33 @@ def _check_deps():
             "Fix:\n"
             "  pip install -U requests urllib3\n"
         )
+    _deps_checked = True
+
+
+def __getattr__(name):
+    """Lazily import the heavy submodules (PEP 562).
 
-_check_deps()
+    `import icon_gen` stays cheap: requests/urllib3 load only when
+    IconGenerator is first touched, and the AI stack (anthropic/openai and
+    their transitive deps) only when an AI attribute is accessed.
+    """
+    if name == "IconGenerator":
+        _check_deps()
+        from .generator import IconGenerator
+        globals()[name] = IconGenerator
+        return IconGenerator
 
-from .generator import IconGenerator
+    if name in ("IconAssistant", "is_ai_available", "get_available_providers"):
+        from . import ai
+        attr = getattr(ai, name)
+        globals()[name] = attr
+        return attr
 
-__all__ = ["IconGenerator"]
+    if name == "AI_AVAILABLE":
+        try:
+            from . import ai  # noqa: F401
+            return True
+        except ImportError:
+            return False
 
-# AI features (optional)
-try:
-    from .ai import IconAssistant, is_ai_available, get_available_providers
-    __all__.extend(["IconAssistant", "is_ai_available", "get_available_providers"])
-    AI_AVAILABLE = True
-except ImportError:
-    AI_AVAILABLE = False
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
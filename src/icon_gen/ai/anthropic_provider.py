@@ -1,6 +1,7 @@
 """Anthropic Claude LLM provider implementation."""
 
 import json
+import re
 from typing import Optional, Dict, Any
 
 try:
@@ -9,6 +10,17 @@ try:
 except ImportError:
     ANTHROPIC_AVAILABLE = False
 
+# orjson parses typical responses several times faster than stdlib json;
+# fall back silently when it is not installed
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
+
+# Matches a whole response wrapped in a markdown code fence
+_FENCE_RE = re.compile(r'^\s*```(?:json)?\s*\n?(.*?)\n?\s*```\s*$', re.DOTALL)
+
 from .base import BaseLLMProvider, LLMResponse, IconSuggestion
 
 
@@ -45,6 +57,9 @@ class AnthropicProvider(BaseLLMProvider):
             client_kwargs["base_url"] = self.base_url
         
         self.client = anthropic.Anthropic(**client_kwargs)
+        self.async_client = anthropic.AsyncAnthropic(**client_kwargs)
+        # System prompt blocks are static per prompt text; build them once
+        self._system_blocks: Dict[str, list] = {}
     
     def get_default_model(self) -> str:
         """Return the default Anthropic model."""
@@ -87,75 +102,170 @@ class AnthropicProvider(BaseLLMProvider):
             Exception: If API call fails
         """
         try:
-            # Build user message
-            user_message = user_prompt
-            if context:
-                user_message += f"\n\nAdditional context: {json.dumps(context, indent=2)}"
-            
-            # Add JSON format instruction to system prompt
-            enhanced_system = system_prompt + "\n\nIMPORTANT: Respond ONLY with valid JSON, no additional text."
-            
-            # Make API call
-            response = self.client.messages.create(
+            # Make API call (rate limited, with backoff on 429/5xx)
+            response = self._call_with_retries(lambda: self.client.messages.create(
                 model=self.model,
                 max_tokens=self.max_tokens,
                 temperature=self.temperature,
-                system=enhanced_system,
+                system=self._build_system_prompt(system_prompt),
                 messages=[
-                    {"role": "user", "content": user_message}
+                    {"role": "user", "content": self._build_user_message(user_prompt, context)}
                 ]
+            ))
+
+            return self._build_llm_response(response, user_prompt)
+
+        except Exception as e:
+            raise Exception(f"Anthropic API error: {str(e)}")
+
+    async def query_async(
+        self,
+        user_prompt: str,
+        system_prompt: str,
+        context: Optional[Dict[str, Any]] = None
+    ) -> LLMResponse:
+        """Async variant of query() using the native AsyncAnthropic client."""
+        try:
+            response = await self._call_with_retries_async(
+                lambda: self.async_client.messages.create(
+                    model=self.model,
+                    max_tokens=self.max_tokens,
+                    temperature=self.temperature,
+                    system=self._build_system_prompt(system_prompt),
+                    messages=[
+                        {"role": "user", "content": self._build_user_message(user_prompt, context)}
+                    ]
+                )
             )
-            
-            # Extract response
-            content = response.content[0].text
-            
-            # Count tokens (approximate from usage)
-            tokens_used = response.usage.input_tokens + response.usage.output_tokens
-            
-            # Parse JSON response
-            try:
-                # Clean up response if it has markdown code blocks
-                if content.strip().startswith("```"):
-                    # Remove markdown code blocks
-                    content = content.strip()
-                    if content.startswith("```json"):
-                        content = content[7:]  # Remove ```json
-                    elif content.startswith("```"):
-                        content = content[3:]  # Remove ```
-                    if content.endswith("```"):
-                        content = content[:-3]  # Remove trailing ```
-                    content = content.strip()
-                
-                data = json.loads(content)
-            except json.JSONDecodeError as e:
-                # Fallback to text parsing if JSON fails
-                print(f"JSON parsing failed: {e}. Falling back to text parsing.")
-                return self._parse_text_response(content, tokens_used)
-            
-            # Build IconSuggestion objects
-            suggestions = []
-            for item in data.get("suggestions", []):
-                style_suggestions = item.get("style_suggestions")
-                
-                suggestions.append(IconSuggestion(
-                    icon_name=item.get("icon_name", ""),
-                    reason=item.get("reason", ""),
-                    use_case=item.get("use_case", ""),
-                    confidence=item.get("confidence", 0.8),
-                    style_suggestions=style_suggestions
-                ))
-            
-            return LLMResponse(
-                suggestions=suggestions,
-                explanation=data.get("explanation", ""),
-                search_query=data.get("search_query", user_prompt),
-                tokens_used=tokens_used,
-                provider=self.get_provider_name()
-            )
-            
+
+            return self._build_llm_response(response, user_prompt)
+
         except Exception as e:
             raise Exception(f"Anthropic API error: {str(e)}")
-    
+
+    def query_stream(
+        self,
+        user_prompt: str,
+        system_prompt: str,
+        context: Optional[Dict[str, Any]] = None
+    ):
+        """Stream Claude's response, yielding suggestions as they complete.
+
+        Complete {...} objects inside the "suggestions" array are parsed out
+        of the partial JSON buffer while the model is still emitting later
+        ones, so downstream icon generation can overlap with LLM latency.
+
+        Yields:
+            IconSuggestion objects in response order
+
+        Raises:
+            Exception: If the API call fails
+        """
+        try:
+            buffer = ""
+            state = {"pos": None}
+
+            with self.client.messages.stream(
+                model=self.model,
+                max_tokens=self.max_tokens,
+                temperature=self.temperature,
+                system=self._build_system_prompt(system_prompt),
+                messages=[
+                    {"role": "user", "content": self._build_user_message(user_prompt, context)}
+                ]
+            ) as stream:
+                for text in stream.text_stream:
+                    buffer += text
+                    for item in self._drain_suggestions(buffer, state):
+                        yield IconSuggestion(
+                            icon_name=item.get("icon_name", ""),
+                            reason=item.get("reason", ""),
+                            use_case=item.get("use_case", ""),
+                            confidence=item.get("confidence", 0.8),
+                            style_suggestions=item.get("style_suggestions")
+                        )
+
+        except Exception as e:
+            raise Exception(f"Anthropic API error: {str(e)}")
+
+    def _build_user_message(
+        self,
+        user_prompt: str,
+        context: Optional[Dict[str, Any]] = None
+    ) -> str:
+        """Build the user message, appending context if provided."""
+        user_message = user_prompt
+        if context:
+            user_message += f"\n\nAdditional context: {json.dumps(context, indent=2)}"
+        return user_message
+
+    def _build_system_prompt(self, system_prompt: str) -> list:
+        """Build the system prompt block with the JSON format instruction.
+
+        The block is marked with cache_control so Anthropic caches the
+        (long, static) system prompt server-side: repeat calls skip most of
+        the input-token cost and get a faster time-to-first-token. Blocks
+        are memoized per prompt text.
+        """
+        blocks = self._system_blocks.get(system_prompt)
+        if blocks is None:
+            blocks = [{
+                "type": "text",
+                "text": system_prompt + "\n\nIMPORTANT: Respond ONLY with valid JSON, no additional text.",
+                "cache_control": {"type": "ephemeral"},
+            }]
+            self._system_blocks[system_prompt] = blocks
+        return blocks
+
+    def _build_llm_response(self, response, user_prompt: str) -> LLMResponse:
+        """Convert a raw Anthropic message into an LLMResponse."""
+        # Extract response
+        content = response.content[0].text
+
+        # Count tokens (exact counts from usage)
+        prompt_tokens = response.usage.input_tokens
+        completion_tokens = response.usage.output_tokens
+        tokens_used = prompt_tokens + completion_tokens
+
+        # Parse JSON response
+        try:
+            # Strip a markdown code fence, if any, in one anchored match
+            fence = _FENCE_RE.match(content)
+            if fence:
+                content = fence.group(1)
+
+            data = _json_loads(content)
+        except json.JSONDecodeError as e:
+            # Fallback to text parsing if JSON fails
+            print(f"JSON parsing failed: {e}. Falling back to text parsing.")
+            return self._parse_text_response(content, tokens_used)
+
+        # Handle batched multi-query responses
+        data = self._flatten_batch_results(data)
+
+        # Build IconSuggestion objects
+        suggestions = []
+        for item in data.get("suggestions", []):
+            style_suggestions = item.get("style_suggestions")
+
+            suggestions.append(IconSuggestion(
+                icon_name=item.get("icon_name", ""),
+                reason=item.get("reason", ""),
+                use_case=item.get("use_case", ""),
+                confidence=item.get("confidence", 0.8),
+                style_suggestions=style_suggestions
+            ))
+
+        return LLMResponse(
+            suggestions=suggestions,
+            explanation=data.get("explanation", ""),
+            search_query=data.get("search_query", user_prompt),
+            tokens_used=tokens_used,
+            provider=self.get_provider_name(),
+            prompt_tokens=prompt_tokens,
+            completion_tokens=completion_tokens
+        )
+
     def _parse_text_response(self, text: str, tokens_used: int) -> LLMResponse:
         """Fallback parser for non-JSON responses."""
         suggestions = self.parse_icon_suggestions(text)
@@ -168,24 +278,35 @@ class AnthropicProvider(BaseLLMProvider):
             provider=self.get_provider_name()
         )
     
-    def estimate_cost(self, tokens_used: int) -> float:
+    def estimate_cost(
+        self,
+        tokens_used: int,
+        prompt_tokens: int = 0,
+        completion_tokens: int = 0
+    ) -> float:
         """Estimate Anthropic API cost.
-        
+
         Based on Claude 3.5 Haiku pricing (as of 2024):
         - Input: $0.80 per 1M tokens
         - Output: $4.00 per 1M tokens
-        
+
         Args:
             tokens_used: Total tokens (input + output)
-            
+            prompt_tokens: Exact input-token count from usage, if known
+            completion_tokens: Exact output-token count from usage, if known
+
         Returns:
             Estimated cost in USD
         """
-        # Rough estimate: assume 60% input, 40% output
-        input_tokens = tokens_used * 0.6
-        output_tokens = tokens_used * 0.4
-        
+        if prompt_tokens or completion_tokens:
+            input_tokens: float = prompt_tokens
+            output_tokens: float = completion_tokens
+        else:
+            # Rough estimate: assume 60% input, 40% output
+            input_tokens = tokens_used * 0.6
+            output_tokens = tokens_used * 0.4
+
         input_cost = (input_tokens / 1_000_000) * 0.80
         output_cost = (output_tokens / 1_000_000) * 4.00
-        
+
         return input_cost + output_cost
\ No newline at end of file
@@ -1,30 +1,117 @@
 """Main AI assistant for icon discovery and generation."""
 
+import asyncio
+import functools
+import hashlib
+import json
 import os
+import pickle
+import shutil
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
 from typing import Optional, List, Dict, Any, Union
 from pathlib import Path
 
-# Try to load .env file if python-dotenv is available
 try:
-    from dotenv import load_dotenv
-    load_dotenv()  # Load from .env file in current directory
-    # Also try parent directories for workspace-level .env
-    load_dotenv(Path.cwd().parent / '.env')
-except ImportError:
-    # python-dotenv not installed, will use system environment variables only
-    pass
+    from importlib.metadata import version
+    _PACKAGE_VERSION = version("icon-gen-ai")
+except Exception:
+    _PACKAGE_VERSION = "unknown"
+
+# Try to load .env file if python-dotenv is available. Set
+# ICON_GEN_SKIP_DOTENV to skip the filesystem lookups on cold start.
+if not os.environ.get("ICON_GEN_SKIP_DOTENV"):
+    try:
+        from dotenv import load_dotenv
+        load_dotenv()  # Load from .env file in current directory
+        # Also try the parent directory for a workspace-level .env; one
+        # stat up front beats load_dotenv's walk when there is no file
+        _parent_env = os.path.join(os.path.dirname(os.getcwd()), '.env')
+        if os.path.isfile(_parent_env):
+            load_dotenv(_parent_env)
+    except ImportError:
+        # python-dotenv not installed, will use system environment variables only
+        pass
 
 from .base import BaseLLMProvider, LLMResponse, IconSuggestion
 from .prompts import (
     ICON_DISCOVERY_SYSTEM_PROMPT,
+    ICON_DISCOVERY_BATCH_SYSTEM_PROMPT,
     get_enhanced_prompt,
+    get_batch_prompt,
     get_style_recommendations
 )
 
 
+@functools.cache
+def _default_cache_dir() -> Path:
+    """Resolve ~/.icon-gen/cache once per process.
+
+    Path.home() consults the environment (and can stat on some
+    platforms); repeated IconAssistant constructions reuse the resolved
+    path.
+    """
+    return Path.home() / ".icon-gen" / "cache"
+
+
+class _CacheDB:
+    """Single-file SQLite store for cached LLM responses.
+
+    One database replaces a directory of tiny per-key files (each costing
+    an inode and a directory lookup). WAL mode lets concurrent CLI
+    invocations keep reading while a write is in flight, and clearing is a
+    single statement instead of a file-by-file rmtree.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS cache ("
+            "cache_key TEXT PRIMARY KEY, payload BLOB)"
+        )
+        self._conn.commit()
+
+    def get(self, cache_key: str) -> Optional[bytes]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT payload FROM cache WHERE cache_key = ?", (cache_key,)
+            ).fetchone()
+        return row[0] if row else None
+
+    def set(self, cache_key: str, payload: bytes):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO cache (cache_key, payload) VALUES (?, ?)",
+                (cache_key, payload),
+            )
+            self._conn.commit()
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM cache")
+            self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            try:
+                self._conn.execute("PRAGMA optimize")
+                self._conn.close()
+            except sqlite3.Error:
+                pass
+
+
 class IconAssistant:
     """AI-powered assistant for icon discovery and generation."""
-    
+
+    MAX_MEMORY_CACHE = 1024  # entries kept in memory before LRU eviction
+
     def __init__(
         self,
         provider: Optional[BaseLLMProvider] = None,
@@ -40,11 +127,21 @@ class IconAssistant:
         """
         self.provider = provider or self._auto_detect_provider()
         self.enable_caching = enable_caching
-        self.cache_dir = Path(cache_dir or Path.home() / ".icon-gen" / "cache")
-        self.cache: Dict[str, LLMResponse] = {}
-        
+        self.cache_dir = Path(cache_dir) if cache_dir else _default_cache_dir()
+        # LRU-ordered so long-running sessions stay bounded in memory
+        self.cache: "OrderedDict[str, LLMResponse]" = OrderedDict()
+        self._db: Optional[_CacheDB] = None
+        # In-flight table: concurrent callers asking the same query share
+        # one provider call instead of each paying for an LLM round-trip
+        self._inflight: Dict[str, Future] = {}
+        self._inflight_lock = threading.Lock()
+
         if self.enable_caching:
             self.cache_dir.mkdir(parents=True, exist_ok=True)
+            try:
+                self._db = _CacheDB(self.cache_dir / "cache.sqlite")
+            except sqlite3.Error as e:
+                print(f"Warning: Could not open cache database: {e}")
     
     def _auto_detect_provider(self) -> Optional[BaseLLMProvider]:
         """Auto-detect and initialize an LLM provider from environment variables.
@@ -97,86 +194,92 @@ class IconAssistant:
             return False
         return self.provider.is_available()
     
+    @staticmethod
+    @functools.lru_cache(maxsize=1024)
+    def _compute_cache_key(query: str, context_json: Optional[str], stamp: str) -> str:
+        """Hash one canonicalized (query, context, provider) triple.
+
+        Pure function of its string arguments, so repeat lookups for the
+        same query in a session skip the hashing entirely.
+        """
+        h = hashlib.blake2b(digest_size=16)
+        h.update(query.encode())
+        if context_json:
+            h.update(context_json.encode())
+        h.update(stamp.encode())
+        return h.hexdigest()
+
     def _get_cache_key(self, query: str, context: Optional[Dict] = None) -> str:
-        """Generate a cache key for a query."""
-        import hashlib
-        cache_str = query
-        if context:
-            cache_str += str(sorted(context.items()))
-        return hashlib.md5(cache_str.encode()).hexdigest()
+        """Generate a cache key for a query.
+
+        The key covers the provider and model as well, so switching models
+        never serves responses cached for a different one. Context is
+        canonicalized with sorted-key JSON so nested dicts hash
+        deterministically across processes. A version stamp invalidates
+        entries across schema changes.
+        """
+        context_json = (
+            json.dumps(context, sort_keys=True, separators=(",", ":"))
+            if context else None
+        )
+        stamp = f"|{_PACKAGE_VERSION}"
+        if self.provider is not None:
+            stamp = (
+                f"|{self.provider.get_provider_name()}|{self.provider.model}{stamp}"
+            )
+        return self._compute_cache_key(query, context_json, stamp)
     
+    def _remember(self, cache_key: str, response: LLMResponse) -> None:
+        """Insert into the in-memory LRU, evicting the oldest entry when full."""
+        self.cache[cache_key] = response
+        self.cache.move_to_end(cache_key)
+        if len(self.cache) > self.MAX_MEMORY_CACHE:
+            self.cache.popitem(last=False)
+
     def _get_from_cache(self, cache_key: str) -> Optional[LLMResponse]:
         """Get response from cache."""
         if not self.enable_caching:
             return None
         
-        # Check in-memory cache first
-        if cache_key in self.cache:
-            return self.cache[cache_key]
+        # Check in-memory cache first (a hit refreshes its LRU position)
+        cached = self.cache.get(cache_key)
+        if cached is not None:
+            self.cache.move_to_end(cache_key)
+            return cached
         
-        # Check disk cache
-        cache_file = self.cache_dir / f"{cache_key}.json"
-        if cache_file.exists():
+        # Check the on-disk database: unpickling returns a ready
+        # LLMResponse without re-running json.loads + field-by-field
+        # reconstruction
+        if self._db is not None:
             try:
-                import json
-                with open(cache_file, 'r') as f:
-                    data = json.load(f)
-                
-                # Reconstruct LLMResponse
-                suggestions = [
-                    IconSuggestion(**s) for s in data.get('suggestions', [])
-                ]
-                response = LLMResponse(
-                    suggestions=suggestions,
-                    explanation=data.get('explanation', ''),
-                    search_query=data.get('search_query', ''),
-                    tokens_used=data.get('tokens_used', 0),
-                    provider=data.get('provider', 'cached')
-                )
-                
-                # Store in memory
-                self.cache[cache_key] = response
-                return response
+                payload = self._db.get(cache_key)
+                if payload is not None:
+                    response = pickle.loads(payload)
+
+                    # Store in memory (bounded like every other insert)
+                    self._remember(cache_key, response)
+                    return response
             except Exception as e:
                 print(f"Warning: Failed to load cache: {e}")
-        
+
         return None
-    
+
     def _save_to_cache(self, cache_key: str, response: LLMResponse):
         """Save response to cache."""
         if not self.enable_caching:
             return
-        
-        # Save to memory
-        self.cache[cache_key] = response
-        
-        # Save to disk
-        try:
-            import json
-            cache_file = self.cache_dir / f"{cache_key}.json"
-            
-            # Convert to dict
-            data = {
-                'suggestions': [
-                    {
-                        'icon_name': s.icon_name,
-                        'reason': s.reason,
-                        'use_case': s.use_case,
-                        'confidence': s.confidence,
-                        'style_suggestions': s.style_suggestions
-                    }
-                    for s in response.suggestions
-                ],
-                'explanation': response.explanation,
-                'search_query': response.search_query,
-                'tokens_used': response.tokens_used,
-                'provider': response.provider
-            }
-            
-            with open(cache_file, 'w') as f:
-                json.dump(data, f, indent=2)
-        except Exception as e:
-            print(f"Warning: Failed to save cache: {e}")
+
+        # Save to memory, evicting the least recently used entry when full
+        self._remember(cache_key, response)
+
+        # Save to the database. WAL + synchronous=NORMAL keeps writes
+        # atomic for concurrent readers without paying for a full fsync —
+        # the cache is disposable, so crash durability is not required.
+        if self._db is not None:
+            try:
+                self._db.set(cache_key, pickle.dumps(response, protocol=5))
+            except Exception as e:
+                print(f"Warning: Failed to save cache: {e}")
     
     def discover_icons(
         self,
@@ -211,29 +314,263 @@ class IconAssistant:
                 print(f"Using cached response (saved {cached.tokens_used} tokens)")
                 return cached
         
+        # Dedupe concurrent identical requests: if another thread is already
+        # querying for this key, wait on its Future instead of issuing a
+        # second (identical, billable) API call
+        with self._inflight_lock:
+            pending = self._inflight.get(cache_key)
+            if pending is None:
+                future: Future = Future()
+                self._inflight[cache_key] = future
+        if pending is not None:
+            return pending.result()
+
+        try:
+            # Build enhanced prompt
+            enhanced_query = get_enhanced_prompt(query, context)
+
+            # Query LLM
+            print(f"Querying Iconify using {self.provider.get_provider_name()} (model: {self.provider.model})...")
+
+            response = self.provider.query(
+                user_prompt=enhanced_query,
+                system_prompt=ICON_DISCOVERY_SYSTEM_PROMPT,
+                context=context
+            )
+
+            # Display cost estimate
+            cost = self.provider.estimate_cost(
+                response.tokens_used,
+                response.prompt_tokens,
+                response.completion_tokens
+            )
+            print(f"Used {response.tokens_used} tokens (≈${cost:.4f})")
+
+            # Cache the response
+            if use_cache:
+                self._save_to_cache(cache_key, response)
+        except Exception as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._inflight_lock:
+                self._inflight.pop(cache_key, None)
+
+        future.set_result(response)
+        return response
+
+    async def discover_icons_async(
+        self,
+        query: str,
+        context: Optional[Dict[str, Any]] = None,
+        use_cache: bool = True
+    ) -> LLMResponse:
+        """Async variant of discover_icons().
+
+        Args:
+            query: Natural language description (e.g., "payment icons for checkout")
+            context: Optional context (project_type, design_style, etc.)
+            use_cache: Whether to use cached results
+
+        Returns:
+            LLMResponse with icon suggestions
+
+        Raises:
+            RuntimeError: If no LLM provider is available
+        """
+        if not self.is_available():
+            raise RuntimeError(
+                "No LLM provider available. Please set OPENAI_API_KEY or "
+                "ANTHROPIC_API_KEY environment variable, or pass a provider explicitly."
+            )
+
+        # Check cache
+        cache_key = self._get_cache_key(query, context)
+        if use_cache:
+            cached = self._get_from_cache(cache_key)
+            if cached:
+                print(f"Using cached response (saved {cached.tokens_used} tokens)")
+                return cached
+
         # Build enhanced prompt
         enhanced_query = get_enhanced_prompt(query, context)
-        
-        # Query LLM
+
+        response = await self.provider.query_async(
+            user_prompt=enhanced_query,
+            system_prompt=ICON_DISCOVERY_SYSTEM_PROMPT,
+            context=context
+        )
+
+        # Cache the response
+        if use_cache:
+            self._save_to_cache(cache_key, response)
+
+        return response
+
+    async def discover_icons_many(
+        self,
+        queries: List[str],
+        context: Optional[Dict[str, Any]] = None,
+        use_cache: bool = True
+    ) -> List[LLMResponse]:
+        """Discover icons for multiple queries concurrently.
+
+        All queries are fanned out with asyncio.gather, so total latency is
+        roughly that of the slowest single query instead of the sum.
+
+        Args:
+            queries: List of natural language queries
+            context: Optional context applied to every query
+            use_cache: Whether to use cached results
+
+        Returns:
+            List of LLMResponse objects, one per query, in input order
+        """
+        return await asyncio.gather(*[
+            self.discover_icons_async(query, context=context, use_cache=use_cache)
+            for query in queries
+        ])
+
+    def discover_icons_stream(
+        self,
+        query: str,
+        context: Optional[Dict[str, Any]] = None
+    ):
+        """Yield icon suggestions as the LLM streams them.
+
+        Unlike discover_icons(), results arrive one by one while the model
+        is still responding, so callers can hand each suggestion straight to
+        IconGenerator (e.g. via a thread pool) and overlap generation with
+        the LLM's tail latency. Streaming responses bypass the cache.
+
+        Args:
+            query: Natural language description (e.g., "payment icons for checkout")
+            context: Optional context (project_type, design_style, etc.)
+
+        Yields:
+            IconSuggestion objects in response order
+
+        Raises:
+            RuntimeError: If no LLM provider is available
+        """
+        if not self.is_available():
+            raise RuntimeError(
+                "No LLM provider available. Please set OPENAI_API_KEY or "
+                "ANTHROPIC_API_KEY environment variable, or pass a provider explicitly."
+            )
+
+        enhanced_query = get_enhanced_prompt(query, context)
+
         print(f"Querying Iconify using {self.provider.get_provider_name()} (model: {self.provider.model})...")
 
-        response = self.provider.query(
+        yield from self.provider.query_stream(
             user_prompt=enhanced_query,
             system_prompt=ICON_DISCOVERY_SYSTEM_PROMPT,
             context=context
         )
-        
+
+    def discover_icons_batch(
+        self,
+        queries: List[str],
+        context: Optional[Dict[str, Any]] = None,
+        use_cache: bool = True
+    ) -> LLMResponse:
+        """Discover icons for multiple queries with a single LLM call.
+
+        Unlike discover_icons_many(), which issues one request per query, this
+        merges all queries into one batched prompt so the prompt overhead is
+        paid once. Suggestions for all queries come back flattened into one
+        LLMResponse.
+
+        Args:
+            queries: List of natural language queries
+            context: Optional context applied to all queries
+            use_cache: Whether to use cached results
+
+        Returns:
+            LLMResponse with suggestions for all queries
+
+        Raises:
+            RuntimeError: If no LLM provider is available
+        """
+        if not self.is_available():
+            raise RuntimeError(
+                "No LLM provider available. Please set OPENAI_API_KEY or "
+                "ANTHROPIC_API_KEY environment variable, or pass a provider explicitly."
+            )
+
+        # Check cache (all queries hash together as one key)
+        cache_key = self._get_cache_key("\n".join(queries), context)
+        if use_cache:
+            cached = self._get_from_cache(cache_key)
+            if cached:
+                print(f"Using cached response (saved {cached.tokens_used} tokens)")
+                return cached
+
+        batch_prompt = get_batch_prompt(queries, context)
+
+        print(f"Querying Iconify using {self.provider.get_provider_name()} (model: {self.provider.model})...")
+
+        response = self.provider.query(
+            user_prompt=batch_prompt,
+            system_prompt=ICON_DISCOVERY_BATCH_SYSTEM_PROMPT,
+            context=context
+        )
+
         # Display cost estimate
-        cost = self.provider.estimate_cost(response.tokens_used)
+        cost = self.provider.estimate_cost(
+            response.tokens_used,
+            response.prompt_tokens,
+            response.completion_tokens
+        )
         print(f"Used {response.tokens_used} tokens (≈${cost:.4f})")
-        
+
         # Cache the response
         if use_cache:
             self._save_to_cache(cache_key, response)
-        
+
         return response
-    
-    
+
+    def discover_and_generate(
+        self,
+        queries: List[str],
+        context: Optional[Dict[str, Any]] = None,
+        output_dir: str = "output",
+        use_cache: bool = True
+    ) -> List[Path]:
+        """Discover icons for multiple queries and generate them all.
+
+        Fetches suggestions for every query in one batched LLM call, then
+        dispatches all generations through IconGenerator.generate_batch so
+        the downloads run in parallel.
+
+        Args:
+            queries: List of natural language queries
+            context: Optional context applied to all queries
+            output_dir: Directory for the generated icons
+            use_cache: Whether to use cached LLM results
+
+        Returns:
+            List of paths to the generated icons
+        """
+        from ..generator import IconGenerator
+
+        response = self.discover_icons_batch(queries, context=context, use_cache=use_cache)
+
+        generator = IconGenerator(output_dir=output_dir)
+        return generator.generate_batch(response.to_batch_spec())
+
+    def discover_icons_many_sync(
+        self,
+        queries: List[str],
+        context: Optional[Dict[str, Any]] = None,
+        use_cache: bool = True
+    ) -> List[LLMResponse]:
+        """Sync wrapper around discover_icons_many() for non-async callers."""
+        return asyncio.run(
+            self.discover_icons_many(queries, context=context, use_cache=use_cache)
+        )
+
     def get_style_advice(self, style: str) -> Dict[str, Any]:
         """Get style recommendations for a design style.
         
@@ -248,12 +585,32 @@ class IconAssistant:
     def clear_cache(self):
         """Clear the response cache."""
         self.cache.clear()
-        
+
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
         if self.cache_dir.exists():
-            import shutil
             try:
-                shutil.rmtree(self.cache_dir)
+                # Rename is one syscall regardless of how many entries the
+                # directory holds; the unlink storm runs in the background
+                trash = self.cache_dir.with_name(
+                    f"{self.cache_dir.name}.trash-{time.time_ns()}"
+                )
+                os.rename(self.cache_dir, trash)
                 self.cache_dir.mkdir(parents=True, exist_ok=True)
+                threading.Thread(
+                    target=shutil.rmtree,
+                    args=(trash,),
+                    kwargs={"ignore_errors": True},
+                    daemon=True,
+                ).start()
                 print("Cache cleared successfully")
             except Exception as e:
-                print(f"Error clearing cache: {e}")
\ No newline at end of file
+                print(f"Error clearing cache: {e}")
+
+        if self.enable_caching:
+            try:
+                self._db = _CacheDB(self.cache_dir / "cache.sqlite")
+            except sqlite3.Error as e:
+                print(f"Warning: Could not reopen cache database: {e}")
\ No newline at end of file
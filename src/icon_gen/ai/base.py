@@ -1,11 +1,21 @@
 """Abstract base class for LLM providers."""
 
+import asyncio
+import json
+import re
+import threading
+import time
 from abc import ABC, abstractmethod
-from typing import Optional, List, Dict, Any
+from collections import deque
+from functools import cached_property
+from typing import Callable, Optional, List, Dict, Any
 from dataclasses import dataclass
 
+# Matches "collection:icon-name" references in free-form LLM text
+_ICON_RE = re.compile(r'([a-z0-9-]+:[a-z0-9-]+)')
 
-@dataclass
+
+@dataclass(slots=True)
 class IconSuggestion:
     """Represents a suggested icon from the LLM."""
     
@@ -25,10 +35,87 @@ class LLMResponse:
     search_query: str  # The interpreted search query
     tokens_used: int = 0  # For cost tracking
     provider: str = "unknown"
+    prompt_tokens: int = 0  # Exact input-side count from the API
+    completion_tokens: int = 0  # Exact output-side count from the API
+
+    @cached_property
+    def icon_names(self) -> List[str]:
+        """Icon names as a flat column, in suggestion order."""
+        return [s.icon_name for s in self.suggestions]
+
+    @cached_property
+    def styles(self) -> List[Dict[str, Any]]:
+        """Style suggestions as a flat column (empty dict when absent)."""
+        return [s.style_suggestions or {} for s in self.suggestions]
+
+    def to_batch_spec(self) -> Dict[str, dict]:
+        """Build the {output_name: config} dict IconGenerator.generate_batch consumes.
+
+        Returns:
+            Dict mapping sanitized output names to per-icon generation configs
+        """
+        spec: Dict[str, dict] = {}
+        for icon_name, style in zip(self.icon_names, self.styles):
+            output_name = icon_name.replace(":", "_").replace("/", "_")
+            spec[output_name] = {
+                "icon": icon_name,
+                "color": style.get("color"),
+                "size": style.get("size"),
+                "bg_color": style.get("bg_color"),
+                "border_radius": style.get("border_radius", 0),
+            }
+        return spec
+
+
+class TokenBucketRateLimiter:
+    """Thread-safe token bucket limiting calls per rolling time window.
+
+    Shared across providers so concurrent discover_icons calls stay within
+    the per-minute request budget instead of tripping 429s.
+    """
+
+    def __init__(self, max_calls: int = 50, period: float = 60.0):
+        self.max_calls = max_calls
+        self.period = period
+        self._lock = threading.Lock()
+        self._timestamps: deque = deque()
+
+    def _try_acquire(self) -> float:
+        """Take a token if available; return seconds to wait otherwise."""
+        with self._lock:
+            now = time.monotonic()
+            while self._timestamps and now - self._timestamps[0] > self.period:
+                self._timestamps.popleft()
+            if len(self._timestamps) < self.max_calls:
+                self._timestamps.append(now)
+                return 0.0
+            return self.period - (now - self._timestamps[0])
+
+    def acquire(self):
+        """Block until a call slot is available."""
+        while True:
+            wait = self._try_acquire()
+            if wait <= 0:
+                return
+            time.sleep(wait)
+
+    async def acquire_async(self):
+        """Async variant of acquire() that yields instead of blocking."""
+        while True:
+            wait = self._try_acquire()
+            if wait <= 0:
+                return
+            await asyncio.sleep(wait)
+
+
+# One bucket for the whole process, shared by sync and async callers
+_RATE_LIMITER = TokenBucketRateLimiter(max_calls=50, period=60.0)
 
 
 class BaseLLMProvider(ABC):
     """Abstract base class for LLM providers."""
+
+    MAX_RETRIES = 3
     
     def __init__(
         self, 
@@ -52,6 +139,8 @@ class BaseLLMProvider(ABC):
         self.model = model or self.get_default_model()
         self.max_tokens = max_tokens
         self.temperature = temperature
+        # (timestamp, result) memo for is_available() probes
+        self._available_cache: Optional[tuple] = None
         self._validate_config()
     
     @abstractmethod
@@ -94,6 +183,53 @@ class BaseLLMProvider(ABC):
         """
         pass
     
+    def query_stream(
+        self,
+        user_prompt: str,
+        system_prompt: str,
+        context: Optional[Dict[str, Any]] = None
+    ):
+        """Yield IconSuggestion objects as the LLM produces them.
+
+        The default implementation simply runs the blocking query() and
+        yields its suggestions; providers with streaming APIs override this
+        so callers can start generating icons before the response finishes.
+
+        Args:
+            user_prompt: The user's request (e.g., "Find icons for payment")
+            system_prompt: System instructions for the LLM
+            context: Additional context (e.g., previous suggestions, user preferences)
+
+        Yields:
+            IconSuggestion objects in response order
+        """
+        response = self.query(user_prompt, system_prompt, context)
+        yield from response.suggestions
+
+    async def query_async(
+        self,
+        user_prompt: str,
+        system_prompt: str,
+        context: Optional[Dict[str, Any]] = None
+    ) -> LLMResponse:
+        """Async variant of query().
+
+        The default implementation runs the synchronous query() in a worker
+        thread so every provider is usable from async code. Providers with
+        native async clients should override this.
+
+        Args:
+            user_prompt: The user's request (e.g., "Find icons for payment")
+            system_prompt: System instructions for the LLM
+            context: Additional context (e.g., previous suggestions, user preferences)
+
+        Returns:
+            LLMResponse with icon suggestions and metadata
+        """
+        return await asyncio.to_thread(
+            self.query, user_prompt, system_prompt, context
+        )
+
     @abstractmethod
     def is_available(self) -> bool:
         """Check if the provider is available and configured correctly.
@@ -103,6 +239,119 @@ class BaseLLMProvider(ABC):
         """
         pass
     
+    def _is_retryable_error(self, error: Exception) -> bool:
+        """Check whether an API error is worth retrying.
+
+        Covers rate limits and transient server errors without importing any
+        provider SDK: all of them expose status_code on API exceptions and
+        name their rate-limit error class RateLimitError.
+        """
+        status = getattr(error, "status_code", None)
+        if status in (429, 500, 502, 503, 529):
+            return True
+        return "RateLimit" in type(error).__name__
+
+    def _call_with_retries(self, make_request: Callable):
+        """Run an API call with rate limiting and exponential backoff.
+
+        Retries up to MAX_RETRIES times (1s, 2s, 4s) on retryable errors;
+        anything else propagates immediately.
+        """
+        for attempt in range(self.MAX_RETRIES):
+            _RATE_LIMITER.acquire()
+            try:
+                return make_request()
+            except Exception as e:
+                if attempt == self.MAX_RETRIES - 1 or not self._is_retryable_error(e):
+                    raise
+                delay = 2 ** attempt
+                print(f"Retryable {type(e).__name__}, retrying in {delay}s...")
+                time.sleep(delay)
+
+    async def _call_with_retries_async(self, make_request: Callable):
+        """Async variant of _call_with_retries()."""
+        for attempt in range(self.MAX_RETRIES):
+            await _RATE_LIMITER.acquire_async()
+            try:
+                return await make_request()
+            except Exception as e:
+                if attempt == self.MAX_RETRIES - 1 or not self._is_retryable_error(e):
+                    raise
+                delay = 2 ** attempt
+                print(f"Retryable {type(e).__name__}, retrying in {delay}s...")
+                await asyncio.sleep(delay)
+
+    def _drain_suggestions(self, buffer: str, state: Dict[str, Any]) -> list:
+        """Extract complete suggestion objects from a partial JSON buffer.
+
+        Shared by the providers' streaming paths. state carries the scan
+        position between calls so each object is parsed and yielded exactly
+        once. Incomplete trailing objects stay in the buffer until more
+        text arrives.
+        """
+        items = []
+
+        # Locate the start of the "suggestions" array first
+        if state["pos"] is None:
+            key = buffer.find('"suggestions"')
+            if key == -1:
+                return items
+            bracket = buffer.find('[', key)
+            if bracket == -1:
+                return items
+            state["pos"] = bracket + 1
+
+        decoder = json.JSONDecoder()
+        pos = state["pos"]
+
+        while True:
+            while pos < len(buffer) and buffer[pos] in ' \t\r\n,':
+                pos += 1
+            if pos >= len(buffer) or buffer[pos] != '{':
+                break
+            try:
+                obj, pos = decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                break  # Object still incomplete; wait for more text
+            items.append(obj)
+
+        state["pos"] = pos
+        return items
+
+    def _flatten_batch_results(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        """Flatten a batched multi-query response into single-query shape.
+
+        Batched prompts (see ICON_DISCOVERY_BATCH_SYSTEM_PROMPT) return
+        {"results": [{"query": ..., "suggestions": [...]}, ...]} instead of a
+        top-level "suggestions" list. This merges all per-query suggestions so
+        the normal response-building path can handle both shapes.
+
+        Args:
+            data: Parsed JSON response from the LLM
+
+        Returns:
+            Response dict with top-level "suggestions"/"explanation"/"search_query"
+        """
+        if "results" not in data or "suggestions" in data:
+            return data
+
+        results = data.get("results", [])
+        suggestions = []
+        explanations = []
+
+        for result in results:
+            suggestions.extend(result.get("suggestions", []))
+            if result.get("explanation"):
+                explanations.append(result["explanation"])
+
+        return {
+            "suggestions": suggestions,
+            "explanation": " ".join(explanations),
+            "search_query": "; ".join(
+                result.get("query", "") for result in results
+            ),
+        }
+
     def parse_icon_suggestions(self, llm_text: str) -> List[IconSuggestion]:
         """Parse icon suggestions from LLM response text.
         
@@ -118,11 +367,9 @@ class BaseLLMProvider(ABC):
         # This is a simple default implementation
         # Providers can override with more sophisticated parsing
         suggestions = []
-        
+
         # Look for patterns like "mdi:icon-name" or "simple-icons:name"
-        import re
-        pattern = r'([a-z0-9-]+:[a-z0-9-]+)'
-        matches = re.findall(pattern, llm_text.lower())
+        matches = _ICON_RE.findall(llm_text.lower())
         
         for match in matches:
             suggestions.append(IconSuggestion(
@@ -134,12 +381,19 @@ class BaseLLMProvider(ABC):
         
         return suggestions
     
-    def estimate_cost(self, tokens_used: int) -> float:
+    def estimate_cost(
+        self,
+        tokens_used: int,
+        prompt_tokens: int = 0,
+        completion_tokens: int = 0
+    ) -> float:
         """Estimate the cost of the API call.
-        
+
         Args:
-            tokens_used: Number of tokens used
-            
+            tokens_used: Total number of tokens used
+            prompt_tokens: Exact input-token count, when the API reported it
+            completion_tokens: Exact output-token count, when the API reported it
+
         Returns:
             Estimated cost in USD (0.0 if cost tracking not implemented)
         """
@@ -1,16 +1,62 @@
 """OpenAI LLM provider implementation."""
 
+import hashlib
 import json
+import time
 from typing import Optional, Dict, Any, List
 
 try:
+    import httpx  # ships with the openai package
     import openai
     OPENAI_AVAILABLE = True
 except ImportError:
     OPENAI_AVAILABLE = False
 
+# orjson parses typical responses several times faster than stdlib json;
+# fall back silently when it is not installed
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
+
 from .base import BaseLLMProvider, LLMResponse, IconSuggestion
 
+# Fixed tool schema: the model returns structured arguments directly, so
+# well-formed JSON is guaranteed and the regex text-parsing fallback is
+# off the hot path. Kept loose enough to admit both the single-query
+# ("suggestions") and batched ("results") response shapes.
+_RETURN_ICONS_TOOL = {
+    "type": "function",
+    "function": {
+        "name": "return_icons",
+        "description": "Return icon suggestions in the JSON shape the system prompt specifies.",
+        "parameters": {
+            "type": "object",
+            "properties": {
+                "search_query": {"type": "string"},
+                "explanation": {"type": "string"},
+                "suggestions": {
+                    "type": "array",
+                    "items": {
+                        "type": "object",
+                        "properties": {
+                            "icon_name": {"type": "string"},
+                            "reason": {"type": "string"},
+                            "use_case": {"type": "string"},
+                            "confidence": {"type": "number"},
+                            "style_suggestions": {"type": "object"},
+                        },
+                        "required": ["icon_name"],
+                    },
+                },
+                "results": {"type": "array", "items": {"type": "object"}},
+            },
+        },
+    },
+}
+_FORCE_RETURN_ICONS = {"type": "function", "function": {"name": "return_icons"}}
+
 
 class OpenAIProvider(BaseLLMProvider):
     """OpenAI API provider for icon suggestions."""
@@ -43,8 +89,39 @@ class OpenAIProvider(BaseLLMProvider):
         client_kwargs = {"api_key": self.api_key}
         if self.base_url:
             client_kwargs["base_url"] = self.base_url
-        
-        self.client = openai.OpenAI(**client_kwargs)
+
+        # Tune the underlying httpx clients: keep TLS connections alive
+        # between calls (the SDK default pool is small) and bound how long
+        # a stuck connect can block. IconAssistant holds one provider
+        # instance, so the warm pool persists across discover_icons calls.
+        timeout = httpx.Timeout(60.0, connect=10.0)
+        limits = httpx.Limits(max_keepalive_connections=16, max_connections=32)
+
+        self.client = openai.OpenAI(
+            http_client=httpx.Client(timeout=timeout, limits=limits),
+            **client_kwargs
+        )
+        self.async_client = openai.AsyncOpenAI(
+            http_client=httpx.AsyncClient(timeout=timeout, limits=limits),
+            **client_kwargs
+        )
+        # Digest-of-system-prompt memo for server-side prompt caching
+        self._prompt_cache_keys: Dict[str, str] = {}
+
+    def _prompt_cache_key(self, system_prompt: str) -> str:
+        """Return a stable cache key for a system prompt.
+
+        Passed as prompt_cache_key so OpenAI (and compatible endpoints)
+        route repeat calls sharing the long static system prompt to the
+        same prefix cache, cutting prompt-token latency and billing.
+        """
+        key = self._prompt_cache_keys.get(system_prompt)
+        if key is None:
+            key = hashlib.blake2b(
+                system_prompt.encode(), digest_size=8
+            ).hexdigest()
+            self._prompt_cache_keys[system_prompt] = key
+        return key
     
     def get_default_model(self) -> str:
         """Return the default OpenAI model."""
@@ -54,17 +131,33 @@ class OpenAIProvider(BaseLLMProvider):
         """Return provider name."""
         return "openai"
     
+    AVAILABILITY_TTL = 300.0  # seconds before re-probing /v1/models
+
     def is_available(self) -> bool:
-        """Check if OpenAI is available and configured."""
+        """Check if OpenAI is available and configured.
+
+        The first call probes the models endpoint to confirm the API key
+        works; the result is memoized for AVAILABILITY_TTL seconds so the
+        per-query availability gate in IconAssistant does not spend a
+        network round-trip every time.
+        """
         if not OPENAI_AVAILABLE:
             return False
-        
+
+        if self._available_cache is not None:
+            ts, available = self._available_cache
+            if time.monotonic() - ts < self.AVAILABILITY_TTL:
+                return available
+
         try:
             # Quick test to see if API key works
             self.client.models.list()
-            return True
+            available = True
         except Exception:
-            return False
+            available = False
+
+        self._available_cache = (time.monotonic(), available)
+        return available
     
     def query(
         self,
@@ -86,61 +179,163 @@ class OpenAIProvider(BaseLLMProvider):
             Exception: If API call fails
         """
         try:
-            # Build messages
-            messages = [
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_prompt}
-            ]
-            
-            # Add context if provided
-            if context:
-                context_str = f"\nAdditional context: {json.dumps(context, indent=2)}"
-                messages[-1]["content"] += context_str
-            
-            # Make API call
-            response = self.client.chat.completions.create(
+            # Make API call (rate limited, with backoff on 429/5xx)
+            response = self._call_with_retries(lambda: self.client.chat.completions.create(
                 model=self.model,
-                messages=messages,
+                messages=self._build_messages(user_prompt, system_prompt, context),
                 max_tokens=self.max_tokens,
                 temperature=self.temperature,
-                response_format={"type": "json_object"}  # Request JSON response
+                tools=[_RETURN_ICONS_TOOL],
+                tool_choice=_FORCE_RETURN_ICONS,
+                extra_body={"prompt_cache_key": self._prompt_cache_key(system_prompt)}
+            ))
+
+            return self._build_llm_response(response, user_prompt)
+
+        except Exception as e:
+            raise Exception(f"OpenAI API error: {str(e)}")
+
+    async def query_async(
+        self,
+        user_prompt: str,
+        system_prompt: str,
+        context: Optional[Dict[str, Any]] = None
+    ) -> LLMResponse:
+        """Async variant of query() using the native AsyncOpenAI client."""
+        try:
+            response = await self._call_with_retries_async(
+                lambda: self.async_client.chat.completions.create(
+                    model=self.model,
+                    messages=self._build_messages(user_prompt, system_prompt, context),
+                    max_tokens=self.max_tokens,
+                    temperature=self.temperature,
+                    tools=[_RETURN_ICONS_TOOL],
+                    tool_choice=_FORCE_RETURN_ICONS,
+                    extra_body={"prompt_cache_key": self._prompt_cache_key(system_prompt)}
+                )
             )
-            
-            # Extract response
-            content = response.choices[0].message.content
-            tokens_used = response.usage.total_tokens
-            
-            # Parse JSON response
-            try:
-                data = json.loads(content)
-            except json.JSONDecodeError:
-                # Fallback to text parsing if JSON fails
-                return self._parse_text_response(content, tokens_used)
-            
-            # Build IconSuggestion objects
-            suggestions = []
-            for item in data.get("suggestions", []):
-                style_suggestions = item.get("style_suggestions")
-                
-                suggestions.append(IconSuggestion(
-                    icon_name=item.get("icon_name", ""),
-                    reason=item.get("reason", ""),
-                    use_case=item.get("use_case", ""),
-                    confidence=item.get("confidence", 0.8),
-                    style_suggestions=style_suggestions
-                ))
-            
-            return LLMResponse(
-                suggestions=suggestions,
-                explanation=data.get("explanation", ""),
-                search_query=data.get("search_query", user_prompt),
-                tokens_used=tokens_used,
-                provider=self.get_provider_name()
+
+            return self._build_llm_response(response, user_prompt)
+
+        except Exception as e:
+            raise Exception(f"OpenAI API error: {str(e)}")
+
+    def query_stream(
+        self,
+        user_prompt: str,
+        system_prompt: str,
+        context: Optional[Dict[str, Any]] = None
+    ):
+        """Stream the completion, yielding suggestions as they complete.
+
+        Complete {...} objects inside the "suggestions" array are parsed
+        out of the partial JSON buffer while the model is still emitting
+        later ones, so downstream icon generation can overlap with LLM
+        latency instead of waiting for the full reply.
+
+        Yields:
+            IconSuggestion objects in response order
+
+        Raises:
+            Exception: If the API call fails
+        """
+        try:
+            buffer = ""
+            state = {"pos": None}
+
+            stream = self.client.chat.completions.create(
+                model=self.model,
+                messages=self._build_messages(user_prompt, system_prompt, context),
+                max_tokens=self.max_tokens,
+                temperature=self.temperature,
+                response_format={"type": "json_object"},
+                extra_body={"prompt_cache_key": self._prompt_cache_key(system_prompt)},
+                stream=True
             )
-            
+            for chunk in stream:
+                if not chunk.choices:
+                    continue
+                delta = chunk.choices[0].delta.content
+                if not delta:
+                    continue
+                buffer += delta
+                for item in self._drain_suggestions(buffer, state):
+                    yield IconSuggestion(
+                        icon_name=item.get("icon_name", ""),
+                        reason=item.get("reason", ""),
+                        use_case=item.get("use_case", ""),
+                        confidence=item.get("confidence", 0.8),
+                        style_suggestions=item.get("style_suggestions")
+                    )
+
         except Exception as e:
             raise Exception(f"OpenAI API error: {str(e)}")
-    
+
+    def _build_messages(
+        self,
+        user_prompt: str,
+        system_prompt: str,
+        context: Optional[Dict[str, Any]] = None
+    ) -> List[Dict[str, str]]:
+        """Build the chat messages, appending context if provided."""
+        messages = [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": user_prompt}
+        ]
+
+        if context:
+            # Compact separators: pretty-printing only inflates prompt tokens
+            context_str = f"\nAdditional context: {json.dumps(context, separators=(', ', ': '))}"
+            messages[-1]["content"] += context_str
+
+        return messages
+
+    def _build_llm_response(self, response, user_prompt: str) -> LLMResponse:
+        """Convert a raw chat completion into an LLMResponse."""
+        # Extract response: structured tool arguments when the model called
+        # the tool (shape-guaranteed JSON), message text otherwise
+        message = response.choices[0].message
+        if getattr(message, "tool_calls", None):
+            content = message.tool_calls[0].function.arguments
+        else:
+            content = message.content
+        tokens_used = response.usage.total_tokens
+        prompt_tokens = response.usage.prompt_tokens
+        completion_tokens = response.usage.completion_tokens
+
+        # Parse JSON response
+        try:
+            data = _json_loads(content)
+        except json.JSONDecodeError:
+            # Fallback to text parsing if JSON fails
+            return self._parse_text_response(content, tokens_used)
+
+        # Handle batched multi-query responses
+        data = self._flatten_batch_results(data)
+
+        # Build IconSuggestion objects
+        suggestions = []
+        for item in data.get("suggestions", []):
+            style_suggestions = item.get("style_suggestions")
+
+            suggestions.append(IconSuggestion(
+                icon_name=item.get("icon_name", ""),
+                reason=item.get("reason", ""),
+                use_case=item.get("use_case", ""),
+                confidence=item.get("confidence", 0.8),
+                style_suggestions=style_suggestions
+            ))
+
+        return LLMResponse(
+            suggestions=suggestions,
+            explanation=data.get("explanation", ""),
+            search_query=data.get("search_query", user_prompt),
+            tokens_used=tokens_used,
+            provider=self.get_provider_name(),
+            prompt_tokens=prompt_tokens,
+            completion_tokens=completion_tokens
+        )
+
     def _parse_text_response(self, text: str, tokens_used: int) -> LLMResponse:
         """Fallback parser for non-JSON responses."""
         suggestions = self.parse_icon_suggestions(text)
@@ -153,24 +348,35 @@ class OpenAIProvider(BaseLLMProvider):
             provider=self.get_provider_name()
         )
     
-    def estimate_cost(self, tokens_used: int) -> float:
+    def estimate_cost(
+        self,
+        tokens_used: int,
+        prompt_tokens: int = 0,
+        completion_tokens: int = 0
+    ) -> float:
         """Estimate OpenAI API cost.
-        
+
         Based on gpt-4o-mini pricing (as of 2024):
         - Input: $0.150 per 1M tokens
         - Output: $0.600 per 1M tokens
-        
+
         Args:
             tokens_used: Total tokens (input + output)
-            
+            prompt_tokens: Exact input-token count from usage, if known
+            completion_tokens: Exact output-token count from usage, if known
+
         Returns:
             Estimated cost in USD
         """
-        # Rough estimate: assume 60% input, 40% output
-        input_tokens = tokens_used * 0.6
-        output_tokens = tokens_used * 0.4
-        
+        if prompt_tokens or completion_tokens:
+            input_tokens: float = prompt_tokens
+            output_tokens: float = completion_tokens
+        else:
+            # Rough estimate: assume 60% input, 40% output
+            input_tokens = tokens_used * 0.6
+            output_tokens = tokens_used * 0.4
+
         input_cost = (input_tokens / 1_000_000) * 0.150
         output_cost = (output_tokens / 1_000_000) * 0.600
-        
+
         return input_cost + output_cost
\ No newline at end of file
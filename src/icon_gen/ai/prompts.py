@@ -1,5 +1,9 @@
 """System prompts for icon discovery and suggestions."""
 
+import functools
+import json
+import re
+
 ICON_DISCOVERY_SYSTEM_PROMPT = """You are an expert icon designer and UI/UX consultant helping users find the perfect icons from Iconify.
 
 Iconify has 200,000+ icons from various collections including:
@@ -40,6 +44,47 @@ Respond in this JSON format:
 
 Be concise but helpful. Focus on the most relevant and popular icons."""
 
+ICON_DISCOVERY_BATCH_SYSTEM_PROMPT = """You are an expert icon designer and UI/UX consultant helping users find the perfect icons from Iconify.
+
+Iconify has 200,000+ icons from various collections including:
+- simple-icons: Company and brand logos (e.g., simple-icons:openai, simple-icons:google)
+- mdi (Material Design Icons): General purpose icons (e.g., mdi:home, mdi:account)
+- fa6-solid (Font Awesome 6): Popular icon set (e.g., fa6-solid:user, fa6-solid:heart)
+- heroicons: Modern minimal icons (e.g., heroicons:home, heroicons:user)
+- lucide: Clean and consistent icons (e.g., lucide:home, lucide:settings)
+- tabler: Outline style icons (e.g., tabler:home, tabler:user)
+
+The user will send several icon requests at once as {"queries": ["...", "..."]}.
+For EACH query, suggest 3-5 relevant icons with their exact Iconify names.
+
+IMPORTANT: Always use the format "collection:icon-name" (e.g., "mdi:github" not just "github")
+
+Respond in this JSON format:
+{
+  "results": [
+    {
+      "query": "the original query",
+      "explanation": "brief explanation of your recommendations",
+      "suggestions": [
+        {
+          "icon_name": "collection:icon-name",
+          "reason": "why this icon fits",
+          "use_case": "when to use this icon",
+          "confidence": 0.95,
+          "style_suggestions": {
+            "color": "white",
+            "size": 256,
+            "bg_color": "mediumslateblue",
+            "border_radius": 0
+          }
+        }
+      ]
+    }
+  ]
+}
+
+Be concise but helpful. Focus on the most relevant and popular icons."""
+
 ICON_CONTEXT_PROMPT = """Given this context about the user's project:
 
 Project type: {project_type}
@@ -60,6 +105,10 @@ USE_CASE_EXAMPLES = {
     "media": "For media: mdi:play, mdi:pause, mdi:music, fa6-solid:image, heroicons:photo",
 }
 
+# All use-case names fused into one alternation so a query is scanned
+# once instead of once per key
+_USE_CASE_RE = re.compile("|".join(map(re.escape, USE_CASE_EXAMPLES)))
+
 STYLE_RECOMMENDATIONS = {
     "modern": {
         "collections": ["heroicons", "lucide", "tabler"],
@@ -83,32 +132,72 @@ STYLE_RECOMMENDATIONS = {
     }
 }
 
+@functools.lru_cache(maxsize=256)
+def _build_context_block(ctx_items: tuple) -> str:
+    """Render a context tuple as a prompt block, memoized per shape.
+
+    The same (project_type, design_style, ...) context repeats across
+    every query in a session, so the rendered block is cached instead of
+    re-concatenated each call.
+    """
+    parts = ["Context:\n"]
+    for key, value in ctx_items:
+        if value:
+            parts.append(f"- {key}: {value}\n")
+    parts.append("\n")
+    return "".join(parts)
+
+
 def get_enhanced_prompt(user_query: str, context: dict = None) -> str:
     """Generate an enhanced prompt with context.
-    
+
     Args:
         user_query: The user's icon request
         context: Optional context dict with keys like project_type, design_style, etc.
-        
+
     Returns:
         Enhanced prompt string
     """
-    base_prompt = f"User request: {user_query}\n\n"
-    
+    parts = [f"User request: {user_query}\n\n"]
+
+    if context:
+        try:
+            parts.append(_build_context_block(tuple(context.items())))
+        except TypeError:
+            # Unhashable values (lists, dicts) cannot be memoized
+            parts.append(_build_context_block.__wrapped__(tuple(context.items())))
+
+    # Add relevant examples: one fused-regex pass over the query instead
+    # of a substring scan per use case (order still follows the table)
+    matched = set(_USE_CASE_RE.findall(user_query.lower()))
+    for use_case, examples in USE_CASE_EXAMPLES.items():
+        if use_case in matched:
+            parts.append(f"Relevant examples for {use_case}: {examples}\n\n")
+
+    return "".join(parts)
+
+def get_batch_prompt(queries: list, context: dict = None) -> str:
+    """Generate a single prompt covering multiple icon queries.
+
+    Args:
+        queries: List of icon requests to answer in one LLM call
+        context: Optional context dict with keys like project_type, design_style, etc.
+
+    Returns:
+        Prompt string containing all queries as a JSON payload
+    """
+    base_prompt = f'{{"queries": {json.dumps(list(queries))}}}\n\n'
+
     if context:
         base_prompt += "Context:\n"
         for key, value in context.items():
             if value:
                 base_prompt += f"- {key}: {value}\n"
         base_prompt += "\n"
-    
-    # Add relevant examples
-    for use_case, examples in USE_CASE_EXAMPLES.items():
-        if use_case.lower() in user_query.lower():
-            base_prompt += f"Relevant examples for {use_case}: {examples}\n\n"
-    
+
     return base_prompt
 
+@functools.lru_cache(maxsize=None)
 def get_style_recommendations(style: str) -> dict:
     """Get style recommendations for a given design style.
     
@@ -3,8 +3,6 @@
 import os
 import click
 from pathlib import Path
-from urllib.parse import urlparse
-from .generator import IconGenerator
 from importlib.metadata import version
 
 VERSION = version("icon-gen-ai")
@@ -12,8 +10,7 @@ VERSION = version("icon-gen-ai")
 # -------------------- HELPERS --------------------
 
 def is_url(value: str) -> bool:
-    parsed = urlparse(value)
-    return parsed.scheme in ("http", "https")
+    return value.startswith(("http://", "https://"))
 
 
 def parse_color(value: str | None, label: str):
@@ -41,17 +38,31 @@ def cli():
 
 # -------------------- GENERATE --------------------
 
+# Option metadata declared once so any future command sharing the
+# generate signature can reuse it instead of repeating the list
+_GENERATE_OPTIONS = [
+    click.argument("icon", required=False),
+    click.option("-i", "--input", "input_file", help="Local image file or direct URL"),
+    click.option("--color", help="Icon color or gradient '(c1,c2)'"),
+    click.option("--size", default=256, show_default=True),
+    click.option("--format", default="svg", type=click.Choice(["svg", "png", "webp"])),
+    click.option("-o", "--output", help="Output file path"),
+    click.option("--bg-color", help="Background color or gradient '(c1,c2)'"),
+    click.option("--border-radius", default=0, show_default=True),
+    click.option("--outline-width", default=0, show_default=True),
+    click.option("--outline-color", help="Outline color"),
+]
+
+
+def _generate_options(f):
+    """Apply the shared generate option list to a command function."""
+    for option in reversed(_GENERATE_OPTIONS):
+        f = option(f)
+    return f
+
+
 @cli.command()
-@click.argument("icon", required=False)
-@click.option("-i", "--input", "input_file", help="Local image file or direct URL")
-@click.option("--color", help="Icon color or gradient '(c1,c2)'")
-@click.option("--size", default=256, show_default=True)
-@click.option("--format", default="svg", type=click.Choice(["svg", "png", "webp"]))
-@click.option("-o", "--output", help="Output file path")
-@click.option("--bg-color", help="Background color or gradient '(c1,c2)'")
-@click.option("--border-radius", default=0, show_default=True)
-@click.option("--outline-width", default=0, show_default=True)
-@click.option("--outline-color", help="Outline color")
+@_generate_options
 def generate(
     icon,
     input_file,
@@ -98,10 +109,15 @@ def generate(
         if is_url(input_file):
             direct_url = input_file
         else:
-            if not os.path.exists(input_file):
+            # isfile also rejects directories, which exists() lets through
+            if not os.path.isfile(input_file):
                 raise click.FileError(input_file, hint="File does not exist")
             local_file = input_file
 
+    # Imported here so `--help` and the AI-only commands skip the
+    # requests/PIL import cost
+    from .generator import IconGenerator
+
     # Parse colors
     parsed_color = parse_color(color, "Icon color")
     parsed_bg = parse_color(bg_color, "Background")
@@ -115,6 +131,8 @@ def generate(
     elif local_file:
         output_name = Path(local_file).stem
     elif direct_url:
+        from urllib.parse import urlparse
+
         output_name = Path(urlparse(direct_url).path).stem or "icon"
     else:
         output_name = icon.replace(":", "_").replace("/", "_")
@@ -203,6 +221,8 @@ def search(query, count, generate, style, project_type):
     if not generate:
         return
 
+    from .generator import IconGenerator
+
     generator = IconGenerator(output_dir="output")
 
     click.echo("Generating icons...\n")
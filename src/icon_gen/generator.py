@@ -1,25 +1,242 @@
 """Core icon generation logic using Iconify API, direct URLs, and local files."""
 
+from __future__ import annotations
+
+import copy
+import functools
+import hashlib
+import os
 import requests
 import re
+import tarfile
+import tempfile
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
 from pathlib import Path
 from typing import Optional, Literal, Union, Tuple
-from xml.etree import ElementTree as ET
 from io import BytesIO
 
+# lxml parses and serializes in C (libxml2), several times faster than the
+# stdlib on the XML hot path; the APIs used here are call-compatible
+try:
+    from lxml import etree as ET
+    LXML_AVAILABLE = True
+except ImportError:
+    from xml.etree import ElementTree as ET
+    LXML_AVAILABLE = False
+
+# Concrete element class for isinstance checks (ET.Element is a factory
+# function under lxml, not a type)
+_ELEMENT_TYPE = type(ET.fromstring("<svg/>"))
+
 try:
     from PIL import Image, ImageColor
     import cairosvg
     RASTER_AVAILABLE = True
-except ImportError:
+except (ImportError, OSError):
     RASTER_AVAILABLE = False
     print("Warning: PIL/cairosvg not available. Gradient icons may not work properly.")
 
+try:
+    from scour import scour as _scour
+    SCOUR_AVAILABLE = True
+except ImportError:
+    SCOUR_AVAILABLE = False
+
+# NumPy turns the per-pixel raster passes into a handful of vectorized
+# array operations; the pure-Python loops remain as fallback
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
 FormatType = Literal["svg", "png", "webp"]
 
+_PAINT_ATTR_RE = re.compile(r'(?:fill|stroke)="([^"]*)"')
+
+# Iconify names are "collection:icon-name"; anything else would only earn
+# a 404 after a full round-trip
+_ICON_NAME_RE = re.compile(r"^[a-z0-9-]+:[a-z0-9._-]+$")
+
+# For the size-only fast path: locate the root tag and its dimensions.
+# The lookbehind keeps the alternation from matching the width="..." tail
+# of attributes like stroke-width ("-" counts as a \b word boundary)
+_SVG_OPEN_RE = re.compile(r"<svg\b[^>]*>")
+_DIM_ATTR_RE = re.compile(r'(?<![\w-])(width|height)="[^"]*"')
+
+# Strips units like "px" or "pt" from width/height values
+_NUM_RE = re.compile(r"[^\d.]")
+
+
+def _clean_dim(raw: str) -> str:
+    """Reduce a width/height attribute to its numeric part.
+
+    Plain numbers (the overwhelmingly common case) pass through without
+    touching the regex engine.
+    """
+    if raw.replace(".", "", 1).isdigit():
+        return raw
+    return _NUM_RE.sub("", raw) or "24"
+
+
+# Element localnames that carry paint attributes when recoloring
+_VISUAL_TAGS = frozenset({
+    'path', 'circle', 'rect', 'polygon', 'ellipse',
+    'polyline', 'line', 'text', 'g',
+})
+
+
+_WORKER_GENERATOR: Optional["IconGenerator"] = None
+
+
+def _init_icon_worker(output_dir: str, cache_dir: str, force: bool, minify: bool) -> None:
+    """Process-pool initializer: build one IconGenerator per worker.
+
+    Sessions and Cairo handles do not cross process boundaries, but one
+    generator per worker (instead of per item) keeps its connection pool
+    and DOM caches warm across everything that worker processes; the
+    shared disk SVG cache still deduplicates downloads between workers.
+    """
+    global _WORKER_GENERATOR
+    _WORKER_GENERATOR = IconGenerator(
+        output_dir=output_dir, cache_dir=cache_dir, force=force, minify=minify
+    )
+
+
+def _generate_icon_worker(kwargs: dict) -> Optional[Path]:
+    """Process-pool entry point: run one generation on the worker's generator."""
+    return _WORKER_GENERATOR.generate_icon(**kwargs)
+
+
+def _only_current_color_paints(svg_content: str) -> bool:
+    """Check whether every fill/stroke in the SVG paints with currentColor.
+
+    Such icons can be recolored with a plain str.replace, which is much
+    cheaper than parsing and walking the DOM.
+    """
+    for value in _PAINT_ATTR_RE.findall(svg_content):
+        if value not in ("currentColor", "none", "transparent"):
+            return False
+    return "currentColor" in svg_content
+
+
+def _all_paints_match(svg_content: str, color: str) -> bool:
+    """Check whether every fill/stroke already carries the requested color.
+
+    True for Iconify responses where the API substituted currentColor
+    server-side — recoloring such an SVG again would be a no-op walk.
+    """
+    values = _PAINT_ATTR_RE.findall(svg_content)
+    return bool(values) and all(
+        v == color or v in ("none", "transparent") for v in values
+    )
+
+
+def _image_to_svg_embed(img) -> str:
+    """Wrap a PIL image in an SVG as a single base64-encoded PNG <image>.
+
+    One embedded bitmap stays orders of magnitude smaller than per-pixel
+    markup and serializes in a single pass.
+    """
+    from base64 import b64encode
+
+    buffer = BytesIO()
+    # Low compression level: zlib level 1 encodes ~5x faster than the
+    # default for bytes that are immediately base64-inflated anyway
+    img.save(buffer, format='PNG', compress_level=1)
+    # getbuffer() hands b64encode a view instead of copying the PNG bytes
+    img_data = b64encode(buffer.getbuffer()).decode('ascii')
+    width, height = img.size
+    return (
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="{height}" '
+        f'viewBox="0 0 {width} {height}">\n'
+        f'<image width="{width}" height="{height}" href="data:image/png;base64,{img_data}" />\n'
+        f'</svg>'
+    )
+
+
+def _apply_gradient_to_image(img, color1: str, color2: str):
+    """Paint a left-to-right gradient over every opaque pixel.
+
+    Shared by the rasterized-SVG path and by local raster sources, which
+    can be gradient-painted straight from the PIL image without an
+    SVG->PNG render in between. Returns the painted image.
+    """
+    width = img.size[0]
+    left_rgb = parse_color(color1)
+    right_rgb = parse_color(color2)
+
+    if NUMPY_AVAILABLE:
+        # Vectorized lerp: one (1, W, 3) gradient row broadcast over all
+        # rows, blitted wherever alpha > 0 — replaces H*W interpreted
+        # iterations with a few array ops
+        arr = np.array(img, dtype=np.uint8)
+        ratio = np.linspace(0.0, 1.0, width, dtype=np.float32)[None, :, None]
+        left = np.asarray(left_rgb, dtype=np.float32)
+        right = np.asarray(right_rgb, dtype=np.float32)
+        grad = (left * (1 - ratio) + right * ratio).astype(np.uint8)
+        mask = arr[..., 3:] > 0
+        arr[..., :3] = np.where(mask, grad, arr[..., :3])
+        return Image.fromarray(arr, "RGBA")
+
+    # The gradient value depends only on x, so lerp once per column into
+    # a LUT and make each pixel a single lookup instead of three lerps
+    denom = width - 1 if width > 1 else 1
+    lut = []
+    for x in range(width):
+        ratio = x / denom
+        lut.append((
+            int(left_rgb[0] * (1 - ratio) + right_rgb[0] * ratio),
+            int(left_rgb[1] * (1 - ratio) + right_rgb[1] * ratio),
+            int(left_rgb[2] * (1 - ratio) + right_rgb[2] * ratio),
+        ))
+
+    new_data = []
+    for idx, (r, g, b, a) in enumerate(img.getdata()):
+        if a > 0:
+            new_data.append((*lut[idx % width], a))
+        else:
+            new_data.append((r, g, b, a))
+    img.putdata(new_data)
+    return img
+
+
+def _recolor_image(img, target_rgb: Tuple[int, int, int]):
+    """Overwrite the RGB channels of every opaque pixel.
+
+    With NumPy this is a single masked store; the per-pixel Python loop
+    remains as fallback. Returns the recolored image (may be a new object).
+    """
+    if NUMPY_AVAILABLE:
+        arr = np.array(img, dtype=np.uint8)
+        mask = arr[..., 3] > 0
+        arr[mask, :3] = target_rgb
+        return Image.fromarray(arr, "RGBA")
+
+    pixels = list(img.getdata())
+    new_pixels = []
+    for r, g, b, a in pixels:
+        if a > 0:  # Non-transparent pixel
+            new_pixels.append((*target_rgb, a))
+        else:
+            new_pixels.append((r, g, b, a))
+    img.putdata(new_pixels)
+    return img
+
 
 def parse_color(color: str) -> Tuple[int, int, int]:
     """Parse color string to RGB tuple (supports hex and CSS3 named colors)."""
+    # Fast path for #rrggbb: one int() call and three shifts, no
+    # ImageColor table lookup or regex
+    if len(color) == 7 and color[0] == "#":
+        try:
+            v = int(color[1:], 16)
+            return ((v >> 16) & 0xFF, (v >> 8) & 0xFF, v & 0xFF)
+        except ValueError:
+            pass
     try:
         rgb = ImageColor.getrgb(color)
         return rgb[:3] if len(rgb) >= 3 else rgb
@@ -30,13 +247,168 @@ def parse_color(color: str) -> Tuple[int, int, int]:
 class IconGenerator:
     ICONIFY_API = "https://api.iconify.design"
 
-    def __init__(self, output_dir: str = "output"):
+    # Sanitizes icon names into filenames in one C-level pass
+    _NAME_TRANSLATE = str.maketrans(":/", "__")
+
+    def __init__(
+        self,
+        output_dir: str = "output",
+        cache_dir: Optional[str] = None,
+        cache_ttl_days: int = 30,
+        minify: bool = False,
+        force: bool = True,
+    ):
         self.output_dir = Path(output_dir)
+        self.minify = minify
+        # force=False skips regeneration when the output file already exists
+        # and was produced from an identical spec
+        self.force = force
         self.output_dir.mkdir(exist_ok=True)
+        # Shared session so batch workers reuse TCP/TLS connections
+        # (requests.Session is thread-safe for GET requests). The adapter is
+        # sized for the batch thread pool and retries transient failures.
+        self.session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=16,
+            pool_maxsize=32,
+            max_retries=Retry(
+                total=3,
+                backoff_factor=0.3,
+                status_forcelist=(429, 500, 502, 503, 504),
+            ),
+        )
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        # Downloaded SVGs are cached in memory and on disk, so repeat
+        # generations skip the HTTPS round-trip entirely
+        self.cache_dir = Path(
+            cache_dir
+            or os.environ.get("ICON_GEN_CACHE_DIR")
+            or Path.home() / ".cache" / "icon-gen" / "svg"
+        )
+        self.cache_ttl_days = cache_ttl_days
+        self._svg_cache: dict[str, str] = {}
+        self._dom_cache: dict[str, ET.Element] = {}
+        self._raster_cache: dict = {}
+        # Final rendered SVG per spec tuple, so identical requests in one
+        # session skip the whole fetch/modify/wrap pipeline
+        self._render_cache: dict = {}
+        # Directories known to exist, so save_svg skips repeat mkdir syscalls
+        self._created_dirs: set[Path] = {self.output_dir}
+        # Icon names that failed format validation (bounded negative cache)
+        self._invalid_names: set[str] = set()
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+        except OSError as e:
+            print(f"Warning: Could not create cache dir {self.cache_dir}: {e}")
+
+    def close(self):
+        """Release the pooled HTTP connections."""
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    # -------------------- SVG CACHE --------------------
+    def _parse_svg(self, svg_content: str) -> ET.Element:
+        """Parse SVG content, reusing a cached DOM for repeated input.
+
+        Rendering the same icon in several color/size variants would
+        otherwise re-parse the identical string each time. The parsed tree
+        is cached and a deepcopy returned, so callers can mutate freely.
+        """
+        key = hashlib.sha1(svg_content.encode()).hexdigest()
+        root = self._dom_cache.get(key)
+        if root is None:
+            root = ET.fromstring(svg_content)
+            if len(self._dom_cache) >= 256:
+                self._dom_cache.clear()
+            self._dom_cache[key] = root
+        return copy.deepcopy(root)
+
+    def _spec_key(self, *spec) -> str:
+        """Hash a generation spec for change detection between runs.
+
+        The local-file mtime is folded in so edited source images are not
+        mistaken for up-to-date outputs.
+        """
+        local_file = spec[7]
+        mtime = None
+        if local_file:
+            try:
+                mtime = Path(local_file).stat().st_mtime_ns
+            except OSError:
+                pass
+        return hashlib.blake2b(
+            repr((spec, mtime)).encode(), digest_size=12
+        ).hexdigest()
+
+    def _render_base_raster(self, svg_content: str, size: int) -> "Image.Image":
+        """Rasterize SVG content to an RGBA image, caching the result.
+
+        Batch runs often rasterize the same icon for several color variants;
+        the CairoSVG render is the expensive part and depends only on
+        (content, size), so variants reuse it and just recolor a copy.
+        """
+        key = (hashlib.sha1(svg_content.encode()).hexdigest(), size)
+        img = self._raster_cache.get(key)
+        if img is None:
+            png_data = cairosvg.svg2png(
+                bytestring=svg_content.encode('utf-8'),
+                output_width=size,
+                output_height=size
+            )
+            img = Image.open(BytesIO(png_data)).convert("RGBA")
+            if len(self._raster_cache) >= 64:
+                self._raster_cache.clear()
+            self._raster_cache[key] = img
+        return img.copy()
+
+    def _svg_cache_path(self, cache_key: str) -> Path:
+        return self.cache_dir / f"{hashlib.sha1(cache_key.encode()).hexdigest()}.svg"
+
+    def _get_cached_svg(self, cache_key: str) -> Optional[str]:
+        """Look up a downloaded SVG in the in-memory, then the disk cache."""
+        if cache_key in self._svg_cache:
+            return self._svg_cache[cache_key]
+
+        cache_file = self._svg_cache_path(cache_key)
+        try:
+            if cache_file.exists():
+                age = time.time() - cache_file.stat().st_mtime
+                if age <= self.cache_ttl_days * 86400:
+                    svg_content = cache_file.read_text(encoding="utf-8")
+                    self._svg_cache[cache_key] = svg_content
+                    return svg_content
+        except OSError as e:
+            print(f"Warning: Failed to read SVG cache: {e}")
+        return None
+
+    def _save_cached_svg(self, cache_key: str, svg_content: str):
+        """Store a downloaded SVG in both caches (atomic disk write)."""
+        self._svg_cache[cache_key] = svg_content
+        try:
+            with tempfile.NamedTemporaryFile(
+                "w",
+                encoding="utf-8",
+                dir=self.cache_dir,
+                suffix=".tmp",
+                delete=False,
+            ) as tmp:
+                tmp.write(svg_content)
+            os.replace(tmp.name, self._svg_cache_path(cache_key))
+        except OSError as e:
+            print(f"Warning: Failed to write SVG cache: {e}")
 
     # -------------------- GRADIENT --------------------
+    # Pure function of its arguments; a batch with a shared gradient
+    # bg_color would otherwise rebuild the identical defs string per icon
+    @staticmethod
+    @functools.lru_cache(maxsize=128)
     def create_gradient_def(
-        self,
         gradient_id: str,
         color1: str,
         color2: str,
@@ -53,6 +425,74 @@ class IconGenerator:
   </linearGradient>
 </defs>"""
 
+    def apply_gradient_via_defs(
+        self,
+        svg_content: str,
+        color1: str,
+        color2: str,
+        size: Optional[int] = None,
+        as_element: bool = False,
+    ) -> Optional[Union[str, ET.Element]]:
+        """Apply a gradient as a native SVG <linearGradient> definition.
+
+        Injects a <defs> gradient and points every visual element's paint
+        at it — a pure vector transform with no rasterization, no
+        per-pixel work and a sub-kilobyte result. Returns None when the
+        content cannot be parsed, so callers can fall back to the raster
+        method.
+        """
+        try:
+            root = self._parse_svg(svg_content)
+        except Exception:
+            return None
+
+        if not root.get("viewBox"):
+            w = _clean_dim(root.get("width", "24"))
+            h = _clean_dim(root.get("height", "24"))
+            root.set("viewBox", f"0 0 {w} {h}")
+        if size:
+            root.set("width", str(size))
+            root.set("height", str(size))
+
+        # Build the defs in the root's namespace so the gradient is
+        # recognized under both the stdlib and lxml backends
+        ns = root.tag[:root.tag.index("}") + 1] if root.tag.startswith("{") else ""
+        defs = ET.Element(f"{ns}defs")
+        gradient = ET.SubElement(
+            defs,
+            f"{ns}linearGradient",
+            {"id": "iconGradient", "x1": "0%", "y1": "0%", "x2": "100%", "y2": "0%"},
+        )
+        ET.SubElement(
+            gradient, f"{ns}stop",
+            {"offset": "0%", "stop-color": color1, "stop-opacity": "1"},
+        )
+        ET.SubElement(
+            gradient, f"{ns}stop",
+            {"offset": "100%", "stop-color": color2, "stop-opacity": "1"},
+        )
+        root.insert(0, defs)
+
+        fill_ref = "url(#iconGradient)"
+        for el in root.iter():
+            if not isinstance(el.tag, str):
+                continue  # comments/PIs (lxml yields them)
+            tag = el.tag.rsplit('}', 1)[-1]
+            if tag not in _VISUAL_TAGS:
+                continue
+
+            current_fill = el.get('fill', '')
+            if current_fill and current_fill.lower() not in ('none', 'transparent'):
+                el.set('fill', fill_ref)
+            elif not current_fill and tag != 'g':
+                el.set('fill', fill_ref)
+
+            stroke = el.get('stroke')
+            if stroke and stroke.lower() not in ('none', 'transparent'):
+                el.set('stroke', fill_ref)
+
+        return root if as_element else ET.tostring(root, encoding="unicode")
+
     def apply_gradient_via_raster(
         self,
         svg_content: str,
@@ -64,48 +504,12 @@ class IconGenerator:
             print("Cannot apply gradient: PIL/cairosvg not installed")
             return svg_content
         try:
-            png_data = cairosvg.svg2png(
-                bytestring=svg_content.encode('utf-8'),
-                output_width=size,
-                output_height=size
-            )
-            img = Image.open(BytesIO(png_data)).convert("RGBA")
-            width, height = img.size
-            
-            left_rgb = parse_color(color1)
-            right_rgb = parse_color(color2)
-            
-            pixels = list(img.getdata())
-            new_data = []
-            for y in range(height):
-                for x in range(width):
-                    idx = y * width + x
-                    r, g, b, a = pixels[idx]
-                    if a > 0:
-                        ratio = x / (width - 1) if width > 1 else 0
-                        new_r = int(left_rgb[0] * (1 - ratio) + right_rgb[0] * ratio)
-                        new_g = int(left_rgb[1] * (1 - ratio) + right_rgb[1] * ratio)
-                        new_b = int(left_rgb[2] * (1 - ratio) + right_rgb[2] * ratio)
-                        new_data.append((new_r, new_g, new_b, a))
-                    else:
-                        new_data.append((r, g, b, a))
-            img.putdata(new_data)
-
-            # Convert to SVG rectangles
-            svg_header = f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="{height}" viewBox="0 0 {width} {height}" shape-rendering="crispEdges">\n'
-            svg_content_list = []
-            for y in range(height):
-                for x in range(width):
-                    r, g, b, a = new_data[y * width + x]
-                    if a > 0:
-                        hex_color = f'#{r:02x}{g:02x}{b:02x}'
-                        opacity = a / 255
-                        svg_content_list.append(
-                            f'<rect x="{x}" y="{y}" width="1" height="1" '
-                            f'fill="{hex_color}" fill-opacity="{opacity:.3f}" />'
-                        )
-            svg_footer = '</svg>'
-            return svg_header + '\n'.join(svg_content_list) + svg_footer
+            img = self._render_base_raster(svg_content, size)
+            img = _apply_gradient_to_image(img, color1, color2)
+
+            # Embed the bitmap once instead of emitting one <rect> per
+            # pixel (up to 65k tags and a multi-megabyte file at 256px)
+            return _image_to_svg_embed(img)
 
         except Exception as e:
             print(f"Error applying gradient via raster: {e}")
@@ -127,37 +531,16 @@ class IconGenerator:
         
         try:
             target_rgb = parse_color(target_color)
-            
-            # Convert SVG to PNG
-            png_data = cairosvg.svg2png(
-                bytestring=svg_content.encode('utf-8'),
-                output_width=size,
-                output_height=size
-            )
-            
-            # Open as PIL Image
-            img = Image.open(BytesIO(png_data)).convert("RGBA")
-            width, height = img.size
-            
+
+            # Convert SVG to PNG (cached per content/size)
+            img = self._render_base_raster(svg_content, size)
+
             # Recolor all non-transparent pixels
-            pixels = list(img.getdata())
-            new_pixels = []
-            for r, g, b, a in pixels:
-                if a > 0:  # Non-transparent pixel
-                    new_pixels.append((*target_rgb, a))
-                else:
-                    new_pixels.append((r, g, b, a))
-            
-            img.putdata(new_pixels)
-            
+            img = _recolor_image(img, target_rgb)
+
             # Convert back to SVG with embedded image
-            from base64 import b64encode
-            buffer = BytesIO()
-            img.save(buffer, format='PNG')
-            img_data = b64encode(buffer.getvalue()).decode('utf-8')
-            
-            return f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="{height}" viewBox="0 0 {width} {height}">\n<image width="{width}" height="{height}" href="data:image/png;base64,{img_data}" />\n</svg>'
-            
+            return _image_to_svg_embed(img)
+
         except Exception as e:
             print(f"Error recoloring SVG: {e}")
             import traceback
@@ -165,18 +548,43 @@ class IconGenerator:
             return svg_content
 
     # -------------------- BACKGROUND --------------------
+    # Precompiled wrapper template: one format() call instead of a pile of
+    # f-string concatenations, and :g keeps numbers free of trailing-zero
+    # bloat (smaller files to write and parse downstream)
+    _WRAP_TEMPLATE = (
+        '<svg xmlns="http://www.w3.org/2000/svg" width="{size}" height="{size}" '
+        'viewBox="0 0 {size} {size}">\n'
+        '{gradient_def}\n'
+        '  <rect x="{half_stroke:g}" y="{half_stroke:g}" width="{rect_size:g}" '
+        'height="{rect_size:g}" rx="{rect_radius:g}" ry="{rect_radius:g}" '
+        'fill="{bg_fill}"{outline_attrs} />\n'
+        '  <g transform="translate({tx:g},{ty:g}) scale({scale:g}) '
+        'translate({nx:g},{ny:g})">\n'
+        '{icon_elements}\n'
+        '  </g>\n'
+        '</svg>'
+    )
+
     def wrap_with_background(
         self,
-        svg_content: str,
+        svg_content: Union[str, ET.Element],
         size: int,
         bg_color: Optional[Union[str, tuple[str, str]]] = None,
         border_radius: int = 0,
         outline_width: int = 0,
         outline_color: Optional[str] = None,
     ) -> str:
-        """Wrap SVG icon with a background and optional outline."""
+        """Wrap SVG icon with a background and optional outline.
+
+        Accepts either SVG markup or an already-parsed Element (as handed
+        over by modify_svg in the generate_icon pipeline), which avoids
+        re-parsing the same document twice per icon.
+        """
         try:
-            root = ET.fromstring(svg_content)
+            if isinstance(svg_content, _ELEMENT_TYPE):
+                root = svg_content
+            else:
+                root = self._parse_svg(svg_content)
             vb = root.get("viewBox", "0 0 24 24").split()
             vb_x, vb_y, vb_w, vb_h = map(float, vb)
             icon_elements = "".join(
@@ -184,7 +592,10 @@ class IconGenerator:
             )
         except Exception:
             vb_w = vb_h = 24
-            icon_elements = svg_content
+            icon_elements = (
+                svg_content if isinstance(svg_content, str)
+                else ET.tostring(svg_content, encoding="unicode")
+            )
 
         gradient_def = ""
         if bg_color is None:
@@ -214,13 +625,21 @@ class IconGenerator:
         tx = size / 2
         ty = size / 2
 
-        return f"""<svg xmlns="http://www.w3.org/2000/svg" width="{size}" height="{size}" viewBox="0 0 {size} {size}">
-{gradient_def}
-  <rect x="{half_stroke}" y="{half_stroke}" width="{rect_size}" height="{rect_size}" rx="{rect_radius}" ry="{rect_radius}" fill="{bg_fill}"{outline_attrs} />
-  <g transform="translate({tx},{ty}) scale({scale}) translate({-vb_w/2},{-vb_h/2})">
-{icon_elements}
-  </g>
-</svg>"""
+        return self._WRAP_TEMPLATE.format(
+            size=size,
+            gradient_def=gradient_def,
+            half_stroke=half_stroke,
+            rect_size=rect_size,
+            rect_radius=rect_radius,
+            bg_fill=bg_fill,
+            outline_attrs=outline_attrs,
+            tx=tx,
+            ty=ty,
+            scale=scale,
+            nx=-vb_w / 2,
+            ny=-vb_h / 2,
+            icon_elements=icon_elements,
+        )
 
     # -------------------- MODIFY SVG --------------------
     def modify_svg(
@@ -229,26 +648,55 @@ class IconGenerator:
         color: Optional[Union[str, tuple[str, str]]] = None,
         size: Optional[int] = None,
         preserve_animations: bool = True,
-    ) -> str:
+        as_element: bool = False,
+    ) -> Union[str, ET.Element]:
         """Modify SVG content to apply color and size.
-        
+
         If color is None, preserves original colors.
         If color is a tuple, applies gradient (loses animations).
         If color is a string, attempts to recolor while preserving animations.
-        
+
         Args:
             preserve_animations: If True, tries to preserve <style>, <animate>, etc.
+            as_element: If True, DOM paths return the mutated Element
+                (skipping a serialize + re-parse when the result feeds
+                straight into wrap_with_background); raster paths still
+                return markup strings.
         """
+        # Nothing to change: skip the parse/serialize round-trip entirely
+        if color is None and size is None:
+            return svg_content
+
         try:
             # If no color specified, just apply size
             if color is None:
+                # Size-only fast path: when the root tag already carries a
+                # viewBox and explicit dimensions, rewrite the two attributes
+                # textually and skip the parse/serialize round-trip — the
+                # dominant cost when the content is a large base64 embed
+                if size:
+                    m = _SVG_OPEN_RE.search(svg_content)
+                    if m:
+                        tag = m.group(0)
+                        # Require real width/height attribute matches (not
+                        # just substrings like stroke-width) before taking
+                        # the textual path
+                        dims = {dm.group(1) for dm in _DIM_ATTR_RE.finditer(tag)}
+                        if "viewBox" in tag and dims == {"width", "height"}:
+                            tag = _DIM_ATTR_RE.sub(
+                                lambda dm: f'{dm.group(1)}="{size}"', tag, count=2
+                            )
+                            return (
+                                svg_content[:m.start()] + tag + svg_content[m.end():]
+                            )
+
                 try:
-                    root = ET.fromstring(svg_content)
+                    root = self._parse_svg(svg_content)
                     
                     # Ensure viewBox exists
                     if not root.get("viewBox"):
-                        w = re.sub(r"[^\d.]", "", root.get("width", "24"))
-                        h = re.sub(r"[^\d.]", "", root.get("height", "24"))
+                        w = _clean_dim(root.get("width", "24"))
+                        h = _clean_dim(root.get("height", "24"))
                         root.set("viewBox", f"0 0 {w} {h}")
 
                     # Apply size only
@@ -256,24 +704,39 @@ class IconGenerator:
                         root.set("width", str(size))
                         root.set("height", str(size))
 
-                    return ET.tostring(root, encoding="unicode")
+                    return root if as_element else ET.tostring(root, encoding="unicode")
                 except Exception as e:
                     print(f"Warning: Could not modify SVG: {e}")
                     return svg_content
             
-            # Handle gradient colors - must use raster method (loses animations)
+            # Handle gradient colors: native <linearGradient> defs keep the
+            # result vector (and animations intact); rasterize only when
+            # the markup cannot be parsed
             if isinstance(color, tuple):
+                vector = self.apply_gradient_via_defs(
+                    svg_content, color[0], color[1], size, as_element
+                )
+                if vector is not None:
+                    return vector
                 return self.apply_gradient_via_raster(svg_content, color[0], color[1], size or 256)
             
             # For solid colors with animation preservation
             if color and preserve_animations:
+                # Fast path: icons painted entirely with currentColor recolor
+                # via token replacement, skipping the recursive DOM walk
+                if _only_current_color_paints(svg_content):
+                    recolored = svg_content.replace("currentColor", color)
+                    return self.modify_svg(
+                        recolored, None, size, preserve_animations, as_element
+                    )
+
                 try:
-                    root = ET.fromstring(svg_content)
+                    root = self._parse_svg(svg_content)
                     
                     # Ensure viewBox exists
                     if not root.get("viewBox"):
-                        w = re.sub(r"[^\d.]", "", root.get("width", "24"))
-                        h = re.sub(r"[^\d.]", "", root.get("height", "24"))
+                        w = _clean_dim(root.get("width", "24"))
+                        h = _clean_dim(root.get("height", "24"))
                         root.set("viewBox", f"0 0 {w} {h}")
 
                     # Apply size
@@ -281,35 +744,30 @@ class IconGenerator:
                         root.set("width", str(size))
                         root.set("height", str(size))
 
-                    # Apply color to fill/stroke attributes (preserves animations)
-                    def apply_color_preserve_animation(el):
-                        tag = el.tag.split('}')[-1] if '}' in el.tag else el.tag
-                        
-                        # Skip animation elements
-                        if tag in ('animate', 'animateTransform', 'animateMotion', 'set', 'style'):
-                            return
-                        
-                        visual_tags = {
-                            'path', 'circle', 'rect', 'polygon', 'ellipse',
-                            'polyline', 'line', 'text', 'g'
-                        }
-                        
-                        if tag in visual_tags:
-                            current_fill = el.get('fill', '')
-                            if current_fill and current_fill.lower() not in ('none', 'transparent', 'currentcolor'):
-                                el.set('fill', color)
-                            elif not current_fill and tag != 'g':
-                                el.set('fill', color)
-                            
-                            if el.get('stroke') and el.get('stroke').lower() not in ('none', 'transparent'):
-                                el.set('stroke', color)
-                        
-                        for child in el:
-                            apply_color_preserve_animation(child)
-                    
-                    apply_color_preserve_animation(root)
-                    return ET.tostring(root, encoding="unicode")
-                    
+                    # Apply color to fill/stroke attributes (preserves
+                    # animations: non-visual elements like <animate> and
+                    # <style> are simply never touched). A flat iter() pass
+                    # avoids per-element Python call overhead and recursion
+                    # depth limits on deeply nested groups.
+                    for el in root.iter():
+                        if not isinstance(el.tag, str):
+                            continue  # comments/PIs (lxml yields them)
+                        tag = el.tag.rsplit('}', 1)[-1]
+                        if tag not in _VISUAL_TAGS:
+                            continue
+
+                        current_fill = el.get('fill', '')
+                        if current_fill and current_fill.lower() not in ('none', 'transparent', 'currentcolor'):
+                            el.set('fill', color)
+                        elif not current_fill and tag != 'g':
+                            el.set('fill', color)
+
+                        stroke = el.get('stroke')
+                        if stroke and stroke.lower() not in ('none', 'transparent'):
+                            el.set('stroke', color)
+
+                    return root if as_element else ET.tostring(root, encoding="unicode")
+
                 except Exception as e:
                     print(f"Warning: Could not apply color with animation preservation: {e}")
                     # Fall back to raster method if XML manipulation fails
@@ -324,12 +782,13 @@ class IconGenerator:
             return svg_content
 
     # -------------------- LOCAL FILE --------------------
-    def load_local_file(self, file_path: str, target_color: Optional[str] = None, target_size: Optional[int] = None) -> Optional[tuple[str, bool]]:
+    def load_local_file(self, file_path: str, target_color: Optional[Union[str, tuple[str, str]]] = None, target_size: Optional[int] = None) -> Optional[tuple[str, bool]]:
         """Load local image file. Returns (svg_content, is_raster_image).
-        
-        For raster images, if target_color is provided, recolors during load.
-        If target_size is provided, resizes the image.
-        Returns a tuple: (svg_content, is_raster_image)
+
+        For raster images, if target_color is provided, recolors during load
+        (a tuple paints a gradient directly on the bitmap, with no SVG
+        rasterization round-trip). If target_size is provided, resizes the
+        image. Returns a tuple: (svg_content, is_raster_image)
         """
         file_path = Path(file_path)
         if not file_path.exists():
@@ -354,31 +813,14 @@ class IconGenerator:
             # Resize if requested
             if target_size:
                 img = img.resize((target_size, target_size), Image.Resampling.LANCZOS)
-            
-            width, height = img.size
-            
+
             # Apply color transformation if requested
-            if target_color:
-                target_rgb = parse_color(target_color)
-                
-                # Recolor non-transparent pixels
-                pixels = list(img.getdata())
-                new_pixels = []
-                for r, g, b, a in pixels:
-                    if a > 0:  # Non-transparent pixel
-                        new_pixels.append((*target_rgb, a))
-                    else:
-                        new_pixels.append((r, g, b, a))
-                
-                img.putdata(new_pixels)
-
-            from base64 import b64encode
-            buffer = BytesIO()
-            img.save(buffer, format='PNG')
-            img_data = b64encode(buffer.getvalue()).decode('utf-8')
-
-            svg_content = f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="{height}" viewBox="0 0 {width} {height}">\n<image width="{width}" height="{height}" href="data:image/png;base64,{img_data}" />\n</svg>'
-            return (svg_content, True)  # Is a raster image
+            if isinstance(target_color, tuple):
+                img = _apply_gradient_to_image(img, target_color[0], target_color[1])
+            elif target_color:
+                img = _recolor_image(img, parse_color(target_color))
+
+            return (_image_to_svg_embed(img), True)  # Is a raster image
 
         except Exception as e:
             print(f"Error converting {file_path} to SVG: {e}")
@@ -389,26 +831,72 @@ class IconGenerator:
     # -------------------- FETCH ICONS --------------------
     def get_icon_from_url(self, url: str) -> Optional[str]:
         try:
-            r = requests.get(url, headers={"User-Agent":"Mozilla/5.0"}, timeout=10)
+            r = self.session.get(url, headers={"User-Agent":"Mozilla/5.0"}, timeout=10)
             r.raise_for_status()
-            return r.text
+            # Decode the raw bytes directly: SVG responses often omit a
+            # charset, and r.text would then run charset detection over
+            # the whole body
+            return r.content.decode("utf-8")
         except Exception as e:
             print(f"Error fetching from URL {url}: {e}")
             return None
 
+    # Failed fetches are not retried for this long (negative cache)
+    FAIL_TTL_SECONDS = 60
+
     def get_icon_svg(self, icon_name: str, color: str = "currentColor") -> Optional[str]:
+        # Reject malformed names before spending a network round-trip on a
+        # guaranteed 404; repeats in a batch short-circuit on the set lookup
+        if icon_name in self._invalid_names:
+            return None
+        if not _ICON_NAME_RE.match(icon_name):
+            print(f"Invalid icon name: {icon_name} (expected collection:icon-name)")
+            if len(self._invalid_names) >= 256:
+                self._invalid_names.clear()
+            self._invalid_names.add(icon_name)
+            return None
+
+        cache_key = f"{icon_name}|{color}"
+        cached = self._get_cached_svg(cache_key)
+        if cached is not None:
+            return cached
+
+        # A recent failure marker means the API was unreachable or the icon
+        # does not exist; skip re-fetching so batches fail fast when offline
+        fail_marker = self._svg_cache_path(cache_key).with_suffix(".fail")
         try:
-            r = requests.get(f"{self.ICONIFY_API}/{icon_name}.svg", params={"color":color}, timeout=10)
+            if (
+                fail_marker.exists()
+                and time.time() - fail_marker.stat().st_mtime <= self.FAIL_TTL_SECONDS
+            ):
+                print(f"Skipping icon {icon_name} (recent fetch failure)")
+                return None
+        except OSError:
+            pass
+
+        try:
+            r = self.session.get(f"{self.ICONIFY_API}/{icon_name}.svg", params={"color":color}, timeout=10)
             r.raise_for_status()
-            return r.text
+            svg_content = r.content.decode("utf-8")
+            self._save_cached_svg(cache_key, svg_content)
+            return svg_content
         except Exception as e:
             print(f"Error fetching icon {icon_name}: {e}")
+            try:
+                fail_marker.touch()
+            except OSError:
+                pass
             return None
 
     def save_svg(self, svg_content: str, output_path: Path) -> bool:
         try:
-            output_path.parent.mkdir(parents=True, exist_ok=True)
-            output_path.write_text(svg_content, encoding="utf-8")
+            parent = output_path.parent
+            if parent not in self._created_dirs:
+                parent.mkdir(parents=True, exist_ok=True)
+                self._created_dirs.add(parent)
+            # write_bytes skips the TextIOWrapper layer (newline translation,
+            # incremental encoding); one encode, one buffered write
+            output_path.write_bytes(svg_content.encode("utf-8"))
             return output_path
         except Exception as e:
             print(f"Error saving {output_path}: {e}")
@@ -432,57 +920,168 @@ class IconGenerator:
         size = size or 256
         is_raster_source = False
 
-        if local_file:
-            result = self.load_local_file(
-                local_file,
-                color if color and not isinstance(color, tuple) else None,
-                size,
+        if output_name is None:
+            if local_file:
+                output_name = Path(local_file).stem
+            elif icon_name:
+                output_name = icon_name.translate(self._NAME_TRANSLATE)
+            else:
+                output_name = "icon"
+
+        # With force=False, skip work when the existing output was produced
+        # from an identical spec (re-runs become a couple of file stats).
+        # The sidecar key machinery only exists in that mode, so the
+        # default force=True leaves output directories untouched.
+        output_path = self.output_dir / f"{output_name}.svg"
+        if not self.force:
+            spec_key = self._spec_key(
+                icon_name, color, size, format, direct_url, bg_color,
+                border_radius, local_file, outline_width, outline_color,
             )
-            if result is None:
+            key_file = self.output_dir / ".icon-gen-keys" / output_name
+            try:
+                if (
+                    output_path.exists()
+                    and key_file.exists()
+                    and key_file.read_text() == spec_key
+                ):
+                    print(f"Skipping {output_name} (up to date)")
+                    return output_path
+            except OSError:
+                pass
+
+        # Remote sources are deterministic per spec, so the final SVG can
+        # be memoized and repeat requests reduce to a file write. Local
+        # files are excluded (their content can change between calls).
+        render_key = None
+        svg_content = None
+        if not local_file:
+            render_key = (
+                icon_name, color, size, direct_url, bg_color,
+                border_radius, outline_width, outline_color,
+            )
+            svg_content = self._render_cache.get(render_key)
+
+        if svg_content is None:
+            if local_file:
+                result = self.load_local_file(local_file, color, size)
+                if result is None:
+                    return None
+                svg_content, is_raster_source = result
+
+            elif direct_url:
+                svg_content = self.get_icon_from_url(direct_url)
+
+            elif icon_name:
+                fetch_color = "black" if isinstance(color, tuple) else (color or "currentColor")
+                svg_content = self.get_icon_svg(icon_name, fetch_color)
+                # Iconify substitutes currentColor server-side; when the
+                # response already paints everything in the requested color
+                # there is nothing left to recolor locally
+                if (
+                    svg_content
+                    and isinstance(color, str)
+                    and _all_paints_match(svg_content, color)
+                ):
+                    color = None
+
+            else:
+                print("Error: Must provide icon_name, direct_url, or local_file")
                 return None
-            svg_content, is_raster_source = result
 
-        elif direct_url:
-            svg_content = self.get_icon_from_url(direct_url)
+            if not svg_content:
+                return None
 
-        elif icon_name:
-            fetch_color = "black" if isinstance(color, tuple) else (color or "currentColor")
-            svg_content = self.get_icon_svg(icon_name, fetch_color)
+            needs_wrap = bg_color is not None or border_radius > 0 or outline_width > 0
 
-        else:
-            print("Error: Must provide icon_name, direct_url, or local_file")
-            return None
+            # Apply color + size only for vector sources; hand the parsed
+            # tree straight to the wrapper when one is coming
+            if not is_raster_source:
+                svg_content = self.modify_svg(
+                    svg_content, color, size,
+                    preserve_animations=True, as_element=needs_wrap,
+                )
+
+            # Background / outline wrapper
+            if needs_wrap:
+                svg_content = self.wrap_with_background(
+                    svg_content,
+                    size,
+                    bg_color,
+                    border_radius,
+                    outline_width,
+                    outline_color,
+                )
+
+            if render_key is not None:
+                if len(self._render_cache) >= 256:
+                    self._render_cache.clear()
+                self._render_cache[render_key] = svg_content
 
-        if not svg_content:
+        if not self.save_svg(svg_content, output_path):
             return None
 
-        # Apply color + size only for vector sources
-        if not is_raster_source:
-            svg_content = self.modify_svg(svg_content, color, size, preserve_animations=True)
-
-        # Background / outline wrapper
-        if bg_color is not None or border_radius > 0 or outline_width > 0:
-            svg_content = self.wrap_with_background(
-                svg_content,
-                size,
-                bg_color,
-                border_radius,
-                outline_width,
-                outline_color,
-            )
+        if not self.force:
+            try:
+                if key_file.parent not in self._created_dirs:
+                    key_file.parent.mkdir(parents=True, exist_ok=True)
+                    self._created_dirs.add(key_file.parent)
+                key_file.write_text(spec_key)
+            except OSError:
+                pass  # Spec tracking is best-effort; the icon itself is saved
+
+        return output_path
+
+    # -------------------- BATCH --------------------
+    def _normalize_batch(
+        self,
+        icons: dict[str, str | dict],
+        color,
+        size,
+        bg_color,
+        border_radius,
+        outline_width,
+        outline_color,
+    ) -> list[tuple[str, dict]]:
+        """Coerce the mixed str/dict batch spec into generate_icon kwargs.
+
+        One branchy normalization pass up front keeps the dispatch loop
+        below uniform; invalid entries are dropped with a warning.
+        """
+        items: list[tuple[str, dict]] = []
+
+        for output_name, icon_config in icons.items():
+            if isinstance(icon_config, str):
+                items.append((output_name, {
+                    "icon_name": icon_config,
+                    "output_name": output_name,
+                    "color": color,
+                    "size": size,
+                    "bg_color": bg_color,
+                    "border_radius": border_radius,
+                    "outline_width": outline_width,
+                    "outline_color": outline_color,
+                }))
+
+            elif isinstance(icon_config, dict):
+                items.append((output_name, {
+                    "icon_name": icon_config.get("icon"),
+                    "output_name": output_name,
+                    "color": icon_config.get("color", color),
+                    "size": icon_config.get("size", size),
+                    "direct_url": icon_config.get("url"),
+                    "local_file": icon_config.get("local_file"),
+                    "bg_color": icon_config.get("bg_color", bg_color),
+                    "border_radius": icon_config.get("border_radius", border_radius),
+                    "outline_width": icon_config.get("outline_width", outline_width),
+                    "outline_color": icon_config.get("outline_color", outline_color),
+                }))
 
-        if output_name is None:
-            if local_file:
-                output_name = Path(local_file).stem
-            elif icon_name:
-                output_name = icon_name.replace(":", "_").replace("/", "_")
             else:
-                output_name = "icon"
+                print(f"Invalid config for {output_name}")
 
-        output_path = self.output_dir / f"{output_name}.svg"
-        return output_path if self.save_svg(svg_content, output_path) else None
+        return items
 
-    # -------------------- BATCH --------------------
     def generate_batch(
         self,
         icons: dict[str, str | dict],
@@ -492,44 +1091,112 @@ class IconGenerator:
         border_radius: int = 0,
         outline_width: int = 0,
         outline_color: Optional[str] = None,
+        use_processes: Optional[bool] = None,
+        archive: Optional[Union[str, Path]] = None,
     ) -> list[Path]:
-        """Generate multiple icons at once."""
-        results: list[Path] = []
+        """Generate multiple icons at once.
 
-        for output_name, icon_config in icons.items():
-            print(f"\nGenerating {output_name}...")
+        Icons are fetched concurrently with a thread pool since the work is
+        mostly network-bound (gradients render as vector defs). Pass
+        use_processes=True to dispatch to a process pool instead — only
+        worthwhile when the CairoSVG raster fallback dominates. Results
+        keep the order of the input dict.
 
-            if isinstance(icon_config, str):
-                path = self.generate_icon(
-                    icon_name=icon_config,
-                    output_name=output_name,
-                    color=color,
-                    size=size,
-                    bg_color=bg_color,
-                    border_radius=border_radius,
-                    outline_width=outline_width,
-                    outline_color=outline_color,
-                )
+        When archive is given, the batch outputs are additionally bundled
+        into a single uncompressed tarball at that path — one artifact to
+        copy or ship instead of N loose files.
+        """
+        items = self._normalize_batch(
+            icons, color, size, bg_color, border_radius,
+            outline_width, outline_color,
+        )
+        if not items:
+            return []
 
-            elif isinstance(icon_config, dict):
-                path = self.generate_icon(
-                    icon_name=icon_config.get("icon"),
-                    output_name=output_name,
-                    color=icon_config.get("color", color),
-                    size=icon_config.get("size", size),
-                    direct_url=icon_config.get("url"),
-                    local_file=icon_config.get("local_file"),
-                    bg_color=icon_config.get("bg_color", bg_color),
-                    border_radius=icon_config.get("border_radius", border_radius),
-                    outline_width=icon_config.get("outline_width", outline_width),
-                    outline_color=icon_config.get("outline_color", outline_color),
-                )
+        ordered: list[Optional[Path]] = [None] * len(items)
 
-            else:
-                print(f"Invalid config for {output_name}")
-                continue
+        # Gradients are applied as vector defs these days, so batches are
+        # network-bound and the thread pool is the right default; the
+        # process pool is strictly opt-in for raster-fallback-heavy work
+        if use_processes:
+            pool = ProcessPoolExecutor(
+                max_workers=min(os.cpu_count() or 1, len(items)),
+                initializer=_init_icon_worker,
+                initargs=(
+                    str(self.output_dir), str(self.cache_dir),
+                    self.force, self.minify,
+                ),
+            )
+        else:
+            pool = ThreadPoolExecutor(max_workers=min(16, len(items)))
+
+        with pool as executor:
+            futures = {}
+            for index, (output_name, kwargs) in enumerate(items):
+                print(f"\nGenerating {output_name}...")
+                if use_processes:
+                    future = executor.submit(_generate_icon_worker, kwargs)
+                else:
+                    future = executor.submit(self.generate_icon, **kwargs)
+                futures[future] = index
+
+            for future in as_completed(futures):
+                index = futures[future]
+                try:
+                    ordered[index] = future.result()
+                except Exception as e:
+                    print(f"Error generating {items[index][0]}: {e}")
 
-            if path:
-                results.append(path)
+        paths = [path for path in ordered if path]
 
-        return results
\ No newline at end of file
+        # One minification pass over the whole batch (opt-in)
+        if self.minify:
+            self.optimize_svgs(paths)
+
+        if archive and paths:
+            try:
+                with tarfile.open(archive, "w") as tf:
+                    for path in paths:
+                        tf.add(path, arcname=path.name)
+                print(f"Archived {len(paths)} icons to {archive}")
+            except OSError as e:
+                print(f"Warning: Could not write archive {archive}: {e}")
+
+        return paths
+
+    async def generate_batch_async(self, *args, **kwargs) -> list[Path]:
+        """Async-friendly wrapper around generate_batch.
+
+        The batch already runs its blocking work on thread/process pools;
+        this hands the whole call to a worker thread so callers inside an
+        event loop (e.g. async web handlers) do not stall the loop while
+        the batch drains. Accepts the same arguments as generate_batch.
+        """
+        import asyncio
+
+        return await asyncio.to_thread(self.generate_batch, *args, **kwargs)
+
+    def optimize_svgs(self, paths: list[Path]) -> None:
+        """Minify generated SVG files in place using scour.
+
+        Iconify markup carries unused namespaces, whitespace and
+        high-precision coordinates; scour typically trims 30-70% off the
+        file size. Runs as a single batch pass so per-file setup cost is
+        amortized. No-op (with a warning) when scour is not installed.
+        """
+        if not SCOUR_AVAILABLE:
+            print("Warning: scour not installed. Skipping SVG minification.")
+            print("Install with: pip install scour")
+            return
+
+        options = _scour.sanitizeOptions(None)
+        options.quiet = True
+
+        for path in paths:
+            if path.suffix.lower() != ".svg":
+                continue
+            try:
+                content = path.read_text(encoding="utf-8")
+                path.write_text(_scour.scourString(content, options), encoding="utf-8")
+            except Exception as e:
+                print(f"Warning: Could not minify {path}: {e}")
\ No newline at end of file
@@ -1,9 +1,13 @@
 """Tests for AI assistant caching and utilities."""
 
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+
 import pytest
 from pathlib import Path
 from icon_gen.ai.assistant import IconAssistant
-from icon_gen.ai.base import IconSuggestion, LLMResponse
+from icon_gen.ai.base import BaseLLMProvider, IconSuggestion, LLMResponse
 
 
 def test_assistant_initialization_default():
@@ -127,4 +131,220 @@ def test_is_available_without_provider():
     assistant = IconAssistant()
     # Without API keys, should return False
     result = assistant.is_available()
-    assert isinstance(result, bool)
\ No newline at end of file
+    assert isinstance(result, bool)
+
+# -------------------- FAKE PROVIDER --------------------
+
+class _StaticProvider(BaseLLMProvider):
+    """Minimal in-memory provider so assistant behavior tests run offline."""
+
+    def __init__(self, response, delay=0.0):
+        super().__init__(api_key='test-key')
+        self._response = response
+        self._delay = delay
+        self.calls = 0
+        self.last_user_prompt = None
+
+    def get_default_model(self):
+        return 'static-model'
+
+    def get_provider_name(self):
+        return 'static'
+
+    def is_available(self):
+        return True
+
+    def query(self, user_prompt, system_prompt, context=None):
+        self.calls += 1
+        self.last_user_prompt = user_prompt
+        if self._delay:
+            time.sleep(self._delay)
+        return self._response
+
+
+def _make_response(*icon_names):
+    """Build an LLMResponse with one styled suggestion per icon name."""
+    suggestions = [
+        IconSuggestion(
+            icon_name=name,
+            reason='Test',
+            use_case='Testing',
+            confidence=0.9,
+            style_suggestions={'color': 'white', 'size': 128},
+        )
+        for name in icon_names
+    ]
+    return LLMResponse(
+        suggestions=suggestions,
+        explanation='Test explanation',
+        search_query='test',
+        tokens_used=100,
+        provider='static',
+    )
+
+
+def test_to_batch_spec():
+    """Test LLMResponse converts to a generate_batch spec."""
+    response = _make_response('mdi:github', 'simple-icons:openai')
+
+    spec = response.to_batch_spec()
+
+    assert set(spec) == {'mdi_github', 'simple-icons_openai'}
+    assert spec['mdi_github']['icon'] == 'mdi:github'
+    assert spec['mdi_github']['color'] == 'white'
+    assert spec['mdi_github']['size'] == 128
+    assert spec['mdi_github']['border_radius'] == 0
+
+
+def test_discover_icons_uses_provider_then_cache(tmp_path):
+    """Test discover_icons queries once and serves repeats from cache."""
+    provider = _StaticProvider(_make_response('mdi:home'))
+    assistant = IconAssistant(provider=provider, cache_dir=str(tmp_path / 'cache'))
+
+    first = assistant.discover_icons('home icons q1')
+    second = assistant.discover_icons('home icons q1')
+
+    assert provider.calls == 1
+    assert first.icon_names == second.icon_names == ['mdi:home']
+
+
+def test_cache_persists_across_instances(tmp_path):
+    """Test the SQLite cache survives a new assistant over the same dir."""
+    cache_dir = tmp_path / 'cache'
+    provider = _StaticProvider(_make_response('mdi:home'))
+    assistant = IconAssistant(provider=provider, cache_dir=str(cache_dir))
+    assistant.discover_icons('persistent query q2')
+
+    fresh_provider = _StaticProvider(_make_response('mdi:other'))
+    fresh = IconAssistant(provider=fresh_provider, cache_dir=str(cache_dir))
+    response = fresh.discover_icons('persistent query q2')
+
+    assert fresh_provider.calls == 0  # Served from disk, not the provider
+    assert response.icon_names == ['mdi:home']
+
+
+def test_memory_cache_stays_bounded(tmp_path):
+    """Test the in-memory LRU evicts on both save and disk-hit inserts."""
+    assistant = IconAssistant(cache_dir=str(tmp_path / 'cache'))
+    assistant.MAX_MEMORY_CACHE = 2
+    response = _make_response('mdi:home')
+
+    keys = [f'key-{i}' for i in range(3)]
+    for key in keys:
+        assistant._save_to_cache(key, response)
+    assert len(assistant.cache) == 2
+
+    # Disk hits re-enter through the same bounded path
+    assistant.cache.clear()
+    for key in keys:
+        assert assistant._get_from_cache(key) is not None
+    assert len(assistant.cache) == 2
+
+
+def test_inflight_dedup(tmp_path):
+    """Test concurrent identical queries share one provider call."""
+    provider = _StaticProvider(_make_response('mdi:home'), delay=0.3)
+    assistant = IconAssistant(provider=provider, cache_dir=str(tmp_path / 'cache'))
+
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        futures = [
+            pool.submit(assistant.discover_icons, 'dedup query q3')
+            for _ in range(2)
+        ]
+        responses = [f.result() for f in futures]
+
+    assert provider.calls == 1
+    assert all(r.icon_names == ['mdi:home'] for r in responses)
+
+
+def test_discover_icons_batch(tmp_path):
+    """Test the batched path sends all queries in one provider call."""
+    provider = _StaticProvider(_make_response('mdi:cart', 'mdi:login'))
+    assistant = IconAssistant(provider=provider, cache_dir=str(tmp_path / 'cache'))
+
+    response = assistant.discover_icons_batch(['shopping q4', 'auth q4'])
+
+    assert provider.calls == 1
+    assert 'shopping q4' in provider.last_user_prompt
+    assert 'auth q4' in provider.last_user_prompt
+    assert response.icon_names == ['mdi:cart', 'mdi:login']
+
+    # The batch result is cached under the joined-queries key
+    assistant.discover_icons_batch(['shopping q4', 'auth q4'])
+    assert provider.calls == 1
+
+
+def test_discover_icons_many_sync(tmp_path):
+    """Test the fan-out path returns one response per query, in order."""
+    provider = _StaticProvider(_make_response('mdi:home'))
+    assistant = IconAssistant(provider=provider, cache_dir=str(tmp_path / 'cache'))
+
+    responses = assistant.discover_icons_many_sync(['many q5a', 'many q5b'])
+
+    assert len(responses) == 2
+    assert all(r.icon_names == ['mdi:home'] for r in responses)
+
+
+def test_discover_icons_async(tmp_path):
+    """Test the async variant resolves to the same response shape."""
+    provider = _StaticProvider(_make_response('mdi:home'))
+    assistant = IconAssistant(provider=provider, cache_dir=str(tmp_path / 'cache'))
+
+    response = asyncio.run(assistant.discover_icons_async('async query q6'))
+
+    assert provider.calls == 1
+    assert response.icon_names == ['mdi:home']
+
+
+def test_discover_icons_stream(tmp_path):
+    """Test streaming yields the provider's suggestions one by one."""
+    provider = _StaticProvider(_make_response('mdi:home', 'mdi:star'))
+    assistant = IconAssistant(provider=provider, cache_dir=str(tmp_path / 'cache'))
+
+    suggestions = list(assistant.discover_icons_stream('stream query q7'))
+
+    assert [s.icon_name for s in suggestions] == ['mdi:home', 'mdi:star']
+
+
+def test_is_retryable_error():
+    """Test retry classification by status code and error class name."""
+    provider = _StaticProvider(_make_response('mdi:home'))
+
+    class ServerError(Exception):
+        status_code = 503
+
+    class RateLimitError(Exception):
+        pass
+
+    assert provider._is_retryable_error(ServerError()) is True
+    assert provider._is_retryable_error(RateLimitError()) is True
+    assert provider._is_retryable_error(ValueError('bad input')) is False
+
+
+def test_call_with_retries(tmp_path, monkeypatch):
+    """Test the retry loop recovers from a transient error."""
+    import icon_gen.ai.base as base_module
+    monkeypatch.setattr(base_module.time, 'sleep', lambda seconds: None)
+
+    provider = _StaticProvider(_make_response('mdi:home'))
+
+    class RateLimited(Exception):
+        status_code = 429
+
+    attempts = []
+
+    def flaky():
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise RateLimited()
+        return 'ok'
+
+    assert provider._call_with_retries(flaky) == 'ok'
+    assert len(attempts) == 2
+
+    # Non-retryable errors propagate without another attempt
+    def broken():
+        raise ValueError('bad input')
+
+    with pytest.raises(ValueError):
+        provider._call_with_retries(broken)
@@ -1,9 +1,24 @@
 """Advanced tests for icon generator."""
 
+import tarfile
+
 import pytest
 from pathlib import Path
 from icon_gen.generator import IconGenerator
 
+SAMPLE_SVG = (
+    '<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 24 24" '
+    'width="24" height="24">'
+    '<path d="M4 4h16v16H4z" fill="currentColor"/></svg>'
+)
+
+
+def _write_sample_svg(tmp_path, name="sample.svg"):
+    """Write a small local SVG so tests run without network access."""
+    source = tmp_path / name
+    source.write_text(SAMPLE_SVG)
+    return source
+
 
 def test_gradient_background(tmp_path):
     """Test gradient background generation."""
@@ -160,4 +175,136 @@ def test_modify_svg_with_gradient(tmp_path):
     modified = generator.modify_svg(svg, color=('deeppink', 'mediumslateblue'), size=128)
     
     assert 'width="128"' in modified
-    # May contain gradient if cairosvg available
\ No newline at end of file
+    # May contain gradient if cairosvg available
+
+
+def test_generate_batch_from_local_files(tmp_path):
+    """Test batch generation from local SVG files."""
+    source = _write_sample_svg(tmp_path)
+    generator = IconGenerator(output_dir=str(tmp_path / "out"))
+
+    results = generator.generate_batch({
+        'first': {'local_file': str(source)},
+        'second': {'local_file': str(source), 'color': 'deeppink'},
+    })
+
+    assert len(results) == 2
+    for path in results:
+        assert path.exists()
+        assert path.suffix == '.svg'
+
+
+def test_generate_batch_archive(tmp_path):
+    """Test batch generation bundles outputs into a tarball."""
+    source = _write_sample_svg(tmp_path)
+    generator = IconGenerator(output_dir=str(tmp_path / "out"))
+    archive = tmp_path / "icons.tar"
+
+    results = generator.generate_batch(
+        {
+            'first': {'local_file': str(source)},
+            'second': {'local_file': str(source)},
+        },
+        archive=archive,
+    )
+
+    assert archive.exists()
+    with tarfile.open(archive) as tf:
+        members = sorted(tf.getnames())
+    assert members == sorted(path.name for path in results)
+
+
+def test_generate_batch_use_processes(tmp_path):
+    """Test batch generation with the opt-in process pool."""
+    source = _write_sample_svg(tmp_path)
+    generator = IconGenerator(output_dir=str(tmp_path / "out"))
+
+    results = generator.generate_batch(
+        {
+            'first': {'local_file': str(source)},
+            'second': {'local_file': str(source)},
+        },
+        use_processes=True,
+    )
+
+    assert len(results) == 2
+    for path in results:
+        assert path.exists()
+
+
+def test_force_false_skips_up_to_date_output(tmp_path):
+    """Test force=False skips regeneration of unchanged specs."""
+    source = _write_sample_svg(tmp_path)
+    out_dir = tmp_path / "out"
+    generator = IconGenerator(output_dir=str(out_dir), force=False)
+
+    first = generator.generate_icon(local_file=str(source), output_name='icon')
+    assert first is not None
+    # The spec sidecar only exists in force=False mode
+    key_file = out_dir / '.icon-gen-keys' / 'icon'
+    assert key_file.exists()
+
+    mtime = first.stat().st_mtime_ns
+    second = generator.generate_icon(local_file=str(source), output_name='icon')
+
+    assert second == first
+    assert second.stat().st_mtime_ns == mtime
+
+
+def test_force_true_writes_no_sidecar(tmp_path):
+    """Test the default force=True leaves no spec sidecar behind."""
+    source = _write_sample_svg(tmp_path)
+    out_dir = tmp_path / "out"
+    generator = IconGenerator(output_dir=str(out_dir))
+
+    result = generator.generate_icon(local_file=str(source), output_name='icon')
+
+    assert result is not None
+    assert not (out_dir / '.icon-gen-keys').exists()
+
+
+def test_context_manager(tmp_path):
+    """Test the generator works as a context manager."""
+    source = _write_sample_svg(tmp_path)
+
+    with IconGenerator(output_dir=str(tmp_path / "out")) as generator:
+        result = generator.generate_icon(local_file=str(source))
+
+    assert result is not None
+    assert result.exists()
+
+
+def test_apply_gradient_via_defs(tmp_path):
+    """Test the vector gradient path injects a linearGradient."""
+    generator = IconGenerator(output_dir=str(tmp_path))
+
+    result = generator.apply_gradient_via_defs(
+        SAMPLE_SVG, 'deeppink', 'mediumslateblue', size=128
+    )
+
+    assert result is not None
+    assert 'linearGradient' in result
+    assert 'url(#iconGradient)' in result
+    assert 'width="128"' in result
+
+
+def test_apply_gradient_via_defs_unparseable():
+    """Test unparseable content returns None for the raster fallback."""
+    generator = IconGenerator()
+
+    assert generator.apply_gradient_via_defs('not svg at all', 'red', 'blue') is None
+
+
+def test_modify_svg_size_keeps_stroke_width(tmp_path):
+    """Test the size-only rewrite never touches stroke-width."""
+    generator = IconGenerator(output_dir=str(tmp_path))
+
+    svg = (
+        '<svg viewBox="0 0 24 24" stroke-width="2" width="24" height="24">'
+        '<path d="M0 0"/></svg>'
+    )
+    modified = generator.modify_svg(svg, size=256)
+
+    assert 'stroke-width="2"' in modified
+    assert 'width="256"' in modified
+    assert 'height="256"' in modified